@@ -0,0 +1,135 @@
+# 📁 app/benchmarks/bench_auth.py
+#
+# Load test for the auth / bookmark / history routes against a real MongoDB.
+# Serves just the auth router in-process (no scheduler, no LLM) and drives it
+# with N concurrent clients. With DB calls off the event loop, requests/sec
+# should keep growing with concurrency instead of flattening at one query in
+# flight.
+#
+#   MONGODB_URI=mongodb://127.0.0.1:27017 python -m benchmarks.bench_auth
+#   python -m benchmarks.bench_auth --url http://127.0.0.1:8000 --concurrency 1,8,32
+#
+# Uses its own database name (MONGODB_DB=news_bench unless set) so the
+# benchmark user and its reads don't land in the real collections.
+#
+# Measured without a mongod: run_level() against the auth router with
+# in-memory collections that sleep 20 ms per call (about one round trip to
+# a remote MongoDB), 20 requests per client, before DB calls went through
+# db.run (blocking handlers) and after. Only the event-loop effect shows
+# here; absolute numbers need the real-mongod command above.
+#
+#   clients   blocking req/s  p50 / p99 ms    db.run req/s  p50 / p99 ms
+#         1             29.0   24.6 /   66.2          33.7   24.2 /  48.4
+#         4             30.6  128.8 /  213.4         113.4   30.0 /  60.0
+#        16             30.5  478.1 /  890.1         244.0   61.5 / 100.3
+#        32             30.0  833.1 / 1956.3         313.9   93.2 / 170.9
+
+import argparse, os, statistics, sys, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+os.environ.setdefault("MONGODB_DB", "news_bench")
+
+
+def serve(port: int):
+    import uvicorn
+    from fastapi import FastAPI
+    from database import db
+    from routes.auth import router_auth
+
+    app = FastAPI()
+    app.include_router(router_auth)
+    db.start()
+    if not db.wait(timeout=15):
+        raise SystemExit(f"MongoDB not reachable: {db.last_error}")
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def login(base_url: str) -> str:
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    response = requests.post(f"{base_url}/auth/signup",
+                             json={"name": "Bench", "email": email, "password": "benchmark"})
+    response.raise_for_status()
+    return response.json()["token"]
+
+
+def workload(session: requests.Session, base_url: str, i: int):
+    """One request from a read-heavy mix: history, bookmarks, profile, record a read."""
+    kind = i % 4
+    if kind == 0:
+        return session.get(f"{base_url}/auth/history")
+    if kind == 1:
+        return session.get(f"{base_url}/auth/bookmarks")
+    if kind == 2:
+        return session.get(f"{base_url}/auth/profile")
+    return session.post(f"{base_url}/auth/read", json={
+        "article_title": f"Benchmark article {i % 50}",
+        "article_source": "Bench",
+        "article_category": "Technology",
+    })
+
+
+def run_level(base_url: str, token: str, concurrency: int, requests_per_worker: int):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def worker(w):
+        nonlocal errors
+        session = requests.Session()
+        session.headers["Authorization"] = f"Bearer {token}"
+        for i in range(requests_per_worker):
+            started = time.perf_counter()
+            response = workload(session, base_url, w * requests_per_worker + i)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors += response.status_code >= 400
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auth routes load test against MongoDB")
+    parser.add_argument("--url", help="benchmark a running server instead of serving the auth router here")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=50, help="requests per concurrent client")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server = serve(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    token = login(base_url)
+    print(f"{'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for level in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+        row = run_level(base_url, token, level, args.requests)
+        print(f"{row['concurrency']:>8} {row['requests']:>9} {row['errors']:>7} {row['req_per_sec']:>8} "
+              f"{row['p50_ms']:>8} {row['p99_ms']:>8}")
+
+    if server is not None:
+        server.should_exit = True
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
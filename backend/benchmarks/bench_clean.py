@@ -0,0 +1,109 @@
+# 📁 app/benchmarks/bench_clean.py
+#
+# Micro-benchmark for scraping.fetcher.clean_summary over the summaries of
+# every RSS_FEEDS source (recorded fixtures, or synthetic stand-ins for the
+# sources that have none). Checks that the tiered cleaner returns exactly
+# what BeautifulSoup(html.parser).get_text(" ") did for every summary, and
+# reports which tier handled them and the speedup. Exits 1 on any mismatch.
+#
+#   python -m benchmarks.bench_clean
+#   python -m benchmarks.bench_clean --repeat 50 --min-items 200
+
+import argparse, os, sys, tempfile, time, warnings
+
+os.environ["MONGODB_URI"] = ""
+
+import feedparser
+from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
+
+from benchmarks.feed_replay import FIXTURES_DIR, amplify, generate_synthetic, load_manifest
+from scraping import fetcher
+
+warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
+
+
+def reference(summary_html):
+    """clean_summary as it was: a full BeautifulSoup tree per summary."""
+    if not summary_html:
+        return None
+    text = BeautifulSoup(summary_html, "html.parser").get_text(separator=" ").strip()
+    return text if text else None
+
+
+def tier(summary_html):
+    if not summary_html:
+        return "empty"
+    try:
+        if "<" in summary_html:
+            fetcher._markup_text(summary_html)
+            return "markup"
+        return "entities" if "&" in summary_html else "plain"
+    except fetcher._Fallback:
+        return "soup"
+
+
+def summaries_by_source(fixtures_dir, min_items):
+    manifest = load_manifest(fixtures_dir)
+    result = {}
+    for name in fetcher.RSS_FEEDS:
+        if name not in manifest:
+            continue
+        with open(os.path.join(fixtures_dir, manifest[name]), "rb") as f:
+            payload = f.read()
+        if min_items:
+            payload = amplify(payload, min_items)
+        result[name] = [entry.get("summary", "") for entry in feedparser.parse(payload).entries]
+    return result
+
+
+def best_of(fn, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="clean_summary: tiered cleaner vs. BeautifulSoup")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=20, help="timed passes; the best is reported")
+    parser.add_argument("--min-items", type=int, default=0, help="pad each feed to this many entries")
+    args = parser.parse_args(argv)
+
+    fixtures_dir = args.fixtures
+    if not load_manifest(fixtures_dir):
+        fixtures_dir = tempfile.mkdtemp(prefix="feed_fixtures_")
+        generate_synthetic(fixtures_dir)
+        print(f"No recorded fixtures found, using synthetic feeds in {fixtures_dir}")
+
+    sources = summaries_by_source(fixtures_dir, args.min_items)
+    mismatches = 0
+    print(f"{'source':<20} {'items':>6} {'plain':>6} {'entity':>7} {'markup':>7} {'soup':>5} "
+          f"{'old ms':>8} {'new ms':>8} {'speedup':>8}")
+    totals = {"old": 0.0, "new": 0.0, "items": 0}
+    for name, summaries in sources.items():
+        for summary in summaries:
+            if fetcher.clean_summary(summary) != reference(summary):
+                mismatches += 1
+                print(f"⚠️ {name}: output differs for {summary[:80]!r}")
+        tiers = [tier(s) for s in summaries]
+        old = best_of(reference, summaries, args.repeat)
+        new = best_of(fetcher.clean_summary, summaries, args.repeat)
+        totals["old"] += old
+        totals["new"] += new
+        totals["items"] += len(summaries)
+        print(f"{name:<20} {len(summaries):>6} {tiers.count('plain'):>6} {tiers.count('entities'):>7} "
+              f"{tiers.count('markup'):>7} {tiers.count('soup'):>5} {old * 1000:>8.2f} {new * 1000:>8.2f} "
+              f"{old / new if new else 0:>7.1f}x")
+    if totals["new"]:
+        print(f"{'all ' + str(len(sources)) + ' sources':<20} {totals['items']:>6} {'':>6} {'':>7} {'':>7} {'':>5} "
+              f"{totals['old'] * 1000:>8.2f} {totals['new'] * 1000:>8.2f} {totals['old'] / totals['new']:>7.1f}x")
+    print("identical output" if not mismatches else f"{mismatches} summaries differ")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# 📁 app/benchmarks/bench_digest.py
+#
+# Digest fan-out throughput against a real MongoDB. Seeds --users
+# subscribers (random categories, half by email and half by WhatsApp), a
+# day of articles and --reads reading_history entries per user, then times
+# one DigestEngine.run(). Delivery goes to counting stand-ins, so the
+# numbers are the engine's: candidate query, one history query per user
+# batch, selection, rendering and the last_sent_at stamps.
+#
+#   MONGODB_URI=mongodb://127.0.0.1:27017 python -m benchmarks.bench_digest --users 100000
+#   ... --batches 100,1000,5000   # compare users per history query
+#
+# Uses its own database name (MONGODB_DB=news_bench unless set) and drops
+# the users / reading_history / articles collections there before seeding.
+
+import argparse, os, random, sys, time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("MONGODB_DB", "news_bench")
+
+CATEGORIES = ["Technology", "Business", "Sports", "Health", "Science", "Entertainment", "Politics", "World"]
+
+
+class CountingChannel:
+    configured = True
+
+    def __init__(self):
+        self.submitted = 0
+        self.bytes = 0
+
+    def submit(self, to, *parts):
+        self.submitted += 1
+        self.bytes += len(parts[-1])
+
+    def backlog(self):
+        return 0
+
+
+def seed(users, history, articles, n_users, n_articles, reads_per_user, rng):
+    from pymongo import InsertOne
+    for collection in (users, history, articles):
+        collection.drop()
+    now = datetime.utcnow()
+    titles = []
+    docs = []
+    for i in range(n_articles):
+        title = f"Digest benchmark article {i}"
+        titles.append(title)
+        docs.append({"title": title, "summary": "Summary text. " * 20, "link": f"https://example.com/{i}",
+                     "source": "Bench", "category": rng.choice(CATEGORIES), "published": "Today",
+                     "published_at": now - timedelta(seconds=rng.uniform(0, 23 * 3600))})
+    articles.insert_many(docs)
+    articles.create_index([("published_at", -1), ("_id", -1)])
+
+    batch = []
+    for u in range(n_users):
+        digest = {"enabled": True, "channel": "email"} if u % 2 else \
+            {"enabled": True, "channel": "whatsapp", "whatsapp": f"+1555{u:07d}"}
+        batch.append(InsertOne({"email": f"reader{u}@example.com", "name": f"Reader {u}",
+                                "preferences": {"categories": rng.sample(CATEGORIES, rng.randint(0, 3)),
+                                                "digest": digest}}))
+        if len(batch) == 10000:
+            users.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        users.bulk_write(batch, ordered=False)
+    users.create_index("email", unique=True)
+    users.create_index([("preferences.digest.enabled", 1), ("preferences.digest.last_sent_at", 1)])
+
+    batch = []
+    for u in range(n_users):
+        for title in rng.sample(titles, min(reads_per_user, len(titles))):
+            batch.append({"user_email": f"reader{u}@example.com", "article_title": title,
+                          "read_at": (now - timedelta(seconds=rng.uniform(0, 12 * 3600))).isoformat()})
+        if len(batch) >= 20000:
+            history.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        history.insert_many(batch, ordered=False)
+    history.create_index([("user_email", 1), ("article_title", 1)], unique=True)
+    history.create_index([("user_email", 1), ("read_at", -1), ("_id", -1)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Digest fan-out throughput against MongoDB")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--articles", type=int, default=400, help="articles published in the last day")
+    parser.add_argument("--reads", type=int, default=10, help="reading_history entries per user")
+    parser.add_argument("--batches", default="1000", help="users per history query, one run each")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    from database import db
+    from digest import DigestEngine
+    from main import format_articles_for_email, format_articles_for_whatsapp
+
+    if not db.wait(timeout=15):
+        raise SystemExit(f"MongoDB not reachable: {db.last_error}")
+    users, history, articles = db.collection("users"), db.collection("reading_history"), db.collection("articles")
+
+    started = time.perf_counter()
+    seed(users, history, articles, args.users, args.articles, args.reads, random.Random(args.seed))
+    print(f"Seeded {args.users} users, {args.users * args.reads} reads in {time.perf_counter() - started:.1f}s")
+
+    print(f"{'batch':>6} {'users':>8} {'sent':>8} {'history q':>10} {'seconds':>8} {'users/s':>9} {'MB queued':>10}")
+    for size in [int(b) for b in args.batches.split(",") if b.strip()]:
+        users.update_many({}, {"$unset": {"preferences.digest.last_sent_at": ""}})
+        email, whatsapp = CountingChannel(), CountingChannel()
+        engine = DigestEngine(user_batch=size, email=email, whatsapp_sender=whatsapp)
+        engine.render = {"email": format_articles_for_email, "whatsapp": format_articles_for_whatsapp}
+        report = engine.run(users, history, articles)
+        if "error" in report:
+            raise SystemExit(f"Digest run failed: {report['error']}")
+        print(f"{size:>6} {report['users']:>8} {report['sent']:>8} {report['batches']:>10} "
+              f"{report['seconds']:>8} {report['users_per_sec']:>9} {(email.bytes + whatsapp.bytes) / 1e6:>10.1f}")
+    db.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
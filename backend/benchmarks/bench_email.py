@@ -0,0 +1,80 @@
+# 📁 app/benchmarks/bench_email.py
+#
+# Email delivery throughput (messages/sec) against the local SMTP stand-in.
+# "per-message" is what /send-email used to do: connect, log in, send and
+# quit for every message, one at a time. The pooled runs push the same
+# messages through the Mailer queue, whose sessions pay the handshake once
+# and then send back to back.
+#
+#   python -m benchmarks.bench_email --messages 200 --pools 1,2,4
+#   python -m benchmarks.bench_email --rtt 0.005 --handshake 0.1 --failure-rate 0.05
+
+import argparse, os, smtplib, sys, time
+
+os.environ.setdefault("SMTP_RETRY_BACKOFF", "0.05")
+
+from benchmarks.fake_smtp import FakeSMTPServer
+from mailer import Mailer
+
+SENDER = "bench@example.com"
+
+
+def per_message(host, port, messages, html):
+    mailer = Mailer(host, port, SENDER, "benchmark")
+    started = time.perf_counter()
+    for i in range(messages):
+        job = mailer.submit(f"reader{i}@example.com", "Benchmark", html)
+        with smtplib.SMTP(host, port) as smtp:
+            smtp.login(SENDER, "benchmark")
+            smtp.send_message(mailer._message(mailer._jobs[job["job_id"]]))
+    return time.perf_counter() - started, messages, 0
+
+
+def pooled(host, port, messages, html, pool_size):
+    mailer = Mailer(host, port, SENDER, "benchmark", pool_size=pool_size)
+    mailer.start()
+    started = time.perf_counter()
+    for i in range(messages):
+        mailer.submit(f"reader{i}@example.com", "Benchmark", html)
+    while mailer.sent + mailer.failed < messages:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - started
+    mailer.stop()
+    return elapsed, mailer.sent, mailer.retries, mailer.connections
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SMTP delivery throughput")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--pools", default="1,2,4", help="SMTP session pool sizes to try")
+    parser.add_argument("--rtt", type=float, default=0.005, help="fake server delay per reply")
+    parser.add_argument("--handshake", type=float, default=0.1, help="fake server delay per connection")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--articles", type=int, default=10, help="articles per email body")
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    from main import format_articles_for_email
+    html = format_articles_for_email([
+        {"title": f"Article {i}", "source": "Bench", "summary": "Summary " * 40,
+         "published": "2024-01-01", "link": f"https://example.com/{i}"}
+        for i in range(args.articles)
+    ])
+
+    with FakeSMTPServer(rtt=args.rtt, handshake=args.handshake, failure_rate=args.failure_rate, seed=1) as server:
+        host, port = server.address
+        print(f"{'mode':>12} {'sent':>6} {'retries':>8} {'conns':>6} {'seconds':>8} {'msg/s':>8}")
+        if not args.skip_baseline:
+            server.failure_rate = 0.0  # the old path had no retries
+            elapsed, sent, _ = per_message(host, port, args.messages, html)
+            print(f"{'per-message':>12} {sent:>6} {0:>8} {sent:>6} {elapsed:>8.2f} {sent / elapsed:>8.1f}")
+            server.failure_rate = args.failure_rate
+        for pool_size in [int(p) for p in args.pools.split(",") if p.strip()]:
+            elapsed, sent, retries, connections = pooled(host, port, args.messages, html, pool_size)
+            print(f"{'pool=' + str(pool_size):>12} {sent:>6} {retries:>8} {connections:>6} "
+                  f"{elapsed:>8.2f} {sent / elapsed:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
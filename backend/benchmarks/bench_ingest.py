@@ -0,0 +1,137 @@
+# 📁 app/benchmarks/bench_ingest.py
+#
+# Offline benchmark for scraping.fetcher.get_news. Feeds are served from the
+# local replay server (see feed_replay.py), MongoDB is disabled and the
+# conditional-GET cache is bypassed, so every run does the full ingest work.
+#
+#   python -m benchmarks.bench_ingest
+#   python -m benchmarks.bench_ingest --sizes 20,500,5000 --latency 0.05 --json out.json
+#   python -m benchmarks.bench_ingest --baseline baseline.json --tolerance 0.25   # CI gate
+
+import argparse, contextlib, io, json, os, statistics, sys, tempfile, time, tracemalloc
+
+# Keep the benchmark off the network and off the database
+os.environ["MONGODB_URI"] = ""
+os.environ.setdefault("FEED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "bench_feed_cache.json"))
+
+from benchmarks.feed_replay import FIXTURES_DIR, ReplayServer, generate_synthetic, load_manifest
+from scraping import fetcher
+
+DEFAULT_SIZES = [20, 100, 500, 1000, 5000]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def run_once(n: int, deadline: float, trace_memory: bool = False):
+    # tracemalloc slows allocation-heavy code by an order of magnitude, so
+    # memory is measured on a separate pass from the timed runs
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # get_news logs every source
+        result = fetcher.get_news(n, deadline=deadline, use_cache=False)
+    elapsed = time.perf_counter() - started
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, result["total"], peak
+
+
+def bench_size(n: int, repeat: int, deadline: float, warmup: int = 1):
+    for _ in range(warmup):
+        run_once(n, deadline)
+    times, totals = [], []
+    for _ in range(repeat):
+        elapsed, total, _ = run_once(n, deadline)
+        times.append(elapsed)
+        totals.append(total)
+    _, _, peak = run_once(n, deadline, trace_memory=True)
+    mean_time = statistics.mean(times)
+    return {
+        "n": n,
+        "articles": int(statistics.mean(totals)),
+        "articles_per_sec": round(statistics.mean(totals) / mean_time, 1) if mean_time else 0.0,
+        "p50_ms": round(percentile(times, 50) * 1000, 2),
+        "p99_ms": round(percentile(times, 99) * 1000, 2),
+        "peak_mem_mb": round(peak / (1024 * 1024), 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions against a previous --json output."""
+    previous = {row["n"]: row for row in baseline.get("results", [])}
+    regressions = []
+    for row in results:
+        old = previous.get(row["n"])
+        if not old:
+            continue
+        for key in ("p50_ms", "p99_ms", "peak_mem_mb"):
+            if old[key] and row[key] > old[key] * (1 + tolerance):
+                regressions.append(f"n={row['n']} {key}: {old[key]} -> {row[key]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline get_news benchmark")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--latency", type=float, default=0.0, help="per-request latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--deadline", type=float, default=300.0, help="get_news overall deadline")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    parser.add_argument("--baseline", help="fail if slower than this earlier --json output")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    fixtures_dir = args.fixtures
+    if not load_manifest(fixtures_dir):
+        fixtures_dir = tempfile.mkdtemp(prefix="feed_fixtures_")
+        generate_synthetic(fixtures_dir)
+        print(f"No recorded fixtures found, using synthetic feeds in {fixtures_dir}")
+
+    server = ReplayServer(fixtures_dir, latency=args.latency, jitter=args.jitter,
+                          failure_rate=args.failure_rate, seed=1)
+    original_feeds = fetcher.RSS_FEEDS
+    results = []
+    with server:
+        try:
+            print(f"{'n':>6} {'articles':>9} {'art/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+            for n in sizes:
+                # Each source must hold enough entries for its quota (2 * n // 5)
+                fetcher.RSS_FEEDS = server.feed_urls(items=2 * (n // 5))
+                row = bench_size(n, args.repeat, args.deadline)
+                results.append(row)
+                print(f"{row['n']:>6} {row['articles']:>9} {row['articles_per_sec']:>10} "
+                      f"{row['p50_ms']:>9} {row['p99_ms']:>9} {row['peak_mem_mb']:>8}")
+        finally:
+            fetcher.RSS_FEEDS = original_feeds
+
+    report = {"latency": args.latency, "repeat": args.repeat, "results": results}
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("❌ Ingest regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("✅ No ingest regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# 📁 app/benchmarks/bench_llm.py
+#
+# Throughput of the shared LLM client against the fake model server, by
+# number of concurrent callers. With a non-blocking client, requests/sec
+# should grow with concurrency up to the configured semaphore limit.
+# With --stream, also reports time to the first chunk of each answer.
+#
+#   python -m benchmarks.bench_llm --latency 0.2 --concurrency 1,4,16,64
+#   python -m benchmarks.bench_llm --latency 2 --stream
+
+import argparse, asyncio, statistics, sys, time
+
+from benchmarks.fake_llm import FakeLLMServer
+from llm_client import LLMClient, RestBackend
+
+
+async def run_level(client: LLMClient, concurrency: int, requests_per_worker: int, endpoint: str,
+                    stream: bool = False):
+    latencies, first_chunk = [], []
+
+    async def worker():
+        for _ in range(requests_per_worker):
+            started = time.perf_counter()
+            if stream:
+                first = None
+                async for _chunk in client.stream("Summarize today's news", endpoint=endpoint):
+                    if first is None:
+                        first = time.perf_counter() - started
+                first_chunk.append(first or 0.0)
+            else:
+                await client.generate("Summarize today's news", endpoint=endpoint)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+        "first_ms": round(statistics.median(first_chunk) * 1000, 1) if first_chunk else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared LLM client throughput benchmark")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model latency in seconds")
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=4, help="requests per concurrent caller")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="client-wide semaphore")
+    parser.add_argument("--endpoint", default="chat")
+    parser.add_argument("--stream", action="store_true", help="stream answers and report time to first chunk")
+    args = parser.parse_args(argv)
+
+    with FakeLLMServer(latency=args.latency) as server:
+        backend = RestBackend(server.base_url, max_workers=args.max_concurrency)
+        client = LLMClient(backend=backend, max_concurrency=args.max_concurrency,
+                           endpoint_limits={})
+        print(f"{'callers':>8} {'requests':>9} {'req/s':>8} {'p50 ms':>9} {'max ms':>9}"
+              + (f" {'first ms':>9}" if args.stream else ""))
+        for level in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+            row = asyncio.run(run_level(client, level, args.requests, args.endpoint, args.stream))
+            client._global, client._endpoints = None, {}  # semaphores belong to the finished loop
+            print(f"{row['concurrency']:>8} {row['requests']:>9} {row['req_per_sec']:>8} "
+                  f"{row['p50_ms']:>9} {row['max_ms']:>9}"
+                  + (f" {row['first_ms']:>9}" if args.stream else ""))
+        print(client.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+# 📁 app/benchmarks/bench_login.py
+#
+# Login storm: N clients hammer /auth/login while a probe keeps calling a
+# cheap authenticated endpoint (/auth/me). With bcrypt on its own pool the
+# probe's latency should stay close to its idle value; with bcrypt on the
+# event loop every probe waits behind the hashes in front of it.
+#
+#   MONGODB_URI=mongodb://127.0.0.1:27017 python -m benchmarks.bench_login --storm 16
+#   BCRYPT_ROUNDS=10 ... to see the effect of the cost factor
+
+import argparse, statistics, sys, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.bench_auth import serve
+
+
+def probe(base_url: str, token: str, stop: threading.Event, latencies: list):
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    while not stop.is_set():
+        started = time.perf_counter()
+        session.get(f"{base_url}/auth/me").raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.01)
+
+
+def storm(base_url: str, email: str, password: str, clients: int, duration: float):
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    def client(_):
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            session.post(f"{base_url}/auth/login", json={"email": email, "password": password}).raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    return latencies
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return "n/a"
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+    return f"n={len(latencies):<5} p50={statistics.median(latencies) * 1000:7.1f} ms  p99={p99 * 1000:7.1f} ms"
+
+
+def measure_probe(base_url, token, duration, during=None):
+    latencies, stop = [], threading.Event()
+    thread = threading.Thread(target=probe, args=(base_url, token, stop, latencies), daemon=True)
+    thread.start()
+    result = during() if during else time.sleep(duration)
+    stop.set()
+    thread.join()
+    return latencies, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Login storm vs. latency of the rest of the API")
+    parser.add_argument("--url", help="benchmark a running server instead of serving the auth router here")
+    parser.add_argument("--port", type=int, default=8768)
+    parser.add_argument("--storm", type=int, default=16, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server = serve(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    email, password = f"storm-{uuid.uuid4().hex[:8]}@example.com", "benchmark"
+    response = requests.post(f"{base_url}/auth/signup", json={"name": "Storm", "email": email, "password": password})
+    response.raise_for_status()
+    token = response.json()["token"]
+
+    idle, _ = measure_probe(base_url, token, args.duration)
+    loaded, logins = measure_probe(
+        base_url, token, args.duration,
+        during=lambda: storm(base_url, email, password, args.storm, args.duration)
+    )
+    print(f"probe idle        {summarize(idle)}")
+    print(f"probe under storm {summarize(loaded)}")
+    print(f"logins            {summarize(logins)}  ({len(logins) / args.duration:.1f}/s)")
+
+    if server is not None:
+        server.should_exit = True
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
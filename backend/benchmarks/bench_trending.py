@@ -0,0 +1,96 @@
+# 📁 app/benchmarks/bench_trending.py
+#
+# /auth/trending latency as reading history grows. Feeds the trending
+# engine a week of synthetic reads (Zipf-distributed over a fixed set of
+# articles) at each history size, then times requests for every window.
+# Request latency should stay flat from 10^5 to 10^7 reads: it depends on
+# the top-K size, and the periodic refresh on the number of articles read
+# within the last week, never on the number of reads.
+#
+#   python -m benchmarks.bench_trending --sizes 100000,1000000,10000000
+
+import argparse, random, statistics, sys, threading, time
+
+import requests
+
+BUCKETS = 7 * 24 * 12        # 5-minute buckets in a week
+TITLES_PER_BUCKET = 200      # articles read in each 5-minute bucket
+
+
+def feed(engine, reads: int, articles: int, rng: random.Random, now: float):
+    """Spread reads over the past week; one record() per (bucket, article) with a count."""
+    weights = [1 / (rank + 1) for rank in range(articles)]
+    for b in range(BUCKETS):
+        at = now - (BUCKETS - b) * 300
+        n = reads * (b + 1) // BUCKETS - reads * b // BUCKETS  # this bucket's share, summing to reads
+        k = min(TITLES_PER_BUCKET, n)
+        if not k:
+            continue
+        picks = rng.choices(range(articles), weights=weights, k=k)
+        for j, i in enumerate(picks):
+            engine.record(f"Article {i}", "Bench", "Technology", at, count=n // k + (j < n % k))
+
+
+def serve(port: int):
+    import uvicorn
+    from fastapi import FastAPI
+    from routes.auth import router_auth
+
+    app = FastAPI()
+    app.include_router(router_auth)
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def time_requests(session, base_url, window, n, bump):
+    latencies = []
+    for _ in range(n):
+        bump()  # force a rebuild from the engine, not an ETag/body cache hit
+        started = time.perf_counter()
+        session.get(f"{base_url}/auth/trending", params={"window": window}).raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return statistics.median(latencies) * 1000, latencies[int(0.99 * (len(latencies) - 1))] * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trending latency vs. history size")
+    parser.add_argument("--sizes", default="100000,1000000,10000000", help="total reads per run")
+    parser.add_argument("--articles", type=int, default=20000, help="distinct articles read in the week")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    from response_cache import trending_cache
+    from trending import trending_engine, WINDOWS
+
+    serve(args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    session = requests.Session()
+
+    print(f"{'reads':>10} {'articles':>9} {'feed s':>7} {'refresh ms':>11}  " +
+          "  ".join(f"{w + ' p50/p99 ms':>18}" for w in WINDOWS))
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        rng = random.Random(args.seed)
+        trending_engine._articles = {}
+        trending_engine.reads = 0
+        now = time.time()
+        started = time.perf_counter()
+        feed(trending_engine, size, args.articles, rng, now)
+        fed = time.perf_counter() - started
+        trending_engine.refresh()
+        cells = []
+        for window in WINDOWS:
+            p50, p99 = time_requests(session, base_url, window, args.requests, trending_cache.bump)
+            cells.append(f"{p50:8.2f}/{p99:<8.2f}")
+        print(f"{trending_engine.reads:>10} {len(trending_engine._articles):>9} {fed:>7.1f} "
+              f"{trending_engine.last_refresh_ms:>11}  " + "  ".join(f"{c:>18}" for c in cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# 📁 app/benchmarks/bench_whatsapp.py
+#
+# WhatsApp send throughput against the mock Graph API, which answers 429
+# above its per-second limit. "blocking" is the old path: one unpooled
+# requests.post per message, in sequence, with no retry. The dispatcher
+# runs pace sends with the token bucket at --rate and retry whatever still
+# fails, so every message is delivered and few or no 429s are provoked.
+#
+#   python -m benchmarks.bench_whatsapp --messages 400 --limit 80 --rate 75
+#   python -m benchmarks.bench_whatsapp --rate 200 --failure-rate 0.05   # bucket above the limit: 429s, then retries
+
+import argparse, asyncio, os, sys, time
+
+os.environ.setdefault("WHATSAPP_BACKOFF", "0.1")
+
+import requests
+
+from benchmarks.fake_graph import FakeGraphServer
+from whatsapp import GraphAPISink, WhatsAppDispatcher
+
+TEXT = "📰 *Your News Update from Taaza Khabar*\n\n" + "*1. Headline*\nSummary text.\n\n" * 5
+
+
+def blocking(url, messages):
+    started, ok = time.perf_counter(), 0
+    for i in range(messages):
+        response = requests.post(f"{url}/1/messages", headers={"Authorization": "Bearer x"}, json={
+            "messaging_product": "whatsapp", "to": f"+1555{i:07d}", "type": "text", "text": {"body": TEXT}
+        })
+        ok += response.status_code == 200
+    return time.perf_counter() - started, ok
+
+
+async def dispatched(url, messages, rate, burst, concurrency):
+    dispatcher = WhatsAppDispatcher(GraphAPISink("x", "1", url, max_workers=concurrency),
+                                    rate=rate, burst=burst, concurrency=concurrency)
+    dispatcher.start()
+    started = time.perf_counter()
+    for i in range(messages):
+        dispatcher.submit(f"+1555{i:07d}", TEXT)
+    while dispatcher.sent + dispatcher.failed < messages:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    await dispatcher.stop()
+    return elapsed, dispatcher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WhatsApp dispatcher throughput vs. the mock Graph API")
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock API latency in seconds")
+    parser.add_argument("--limit", type=int, default=80, help="mock API messages/sec before 429s")
+    parser.add_argument("--rate", type=float, default=75, help="dispatcher token-bucket rate")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--concurrency", default="4,8,16")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    with FakeGraphServer(latency=args.latency, limit=args.limit, failure_rate=args.failure_rate, seed=1) as server:
+        print(f"{'mode':>14} {'sent':>6} {'failed':>7} {'429s':>6} {'retries':>8} {'seconds':>8} {'msg/s':>8}")
+        if not args.skip_baseline:
+            throttled = server.throttled
+            elapsed, ok = blocking(server.base_url, args.messages)
+            print(f"{'blocking':>14} {ok:>6} {args.messages - ok:>7} {server.throttled - throttled:>6} {0:>8} "
+                  f"{elapsed:>8.2f} {ok / elapsed:>8.1f}")
+        for level in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+            throttled = server.throttled
+            elapsed, d = asyncio.run(dispatched(server.base_url, args.messages, args.rate, args.burst, level))
+            print(f"{'workers=' + str(level):>14} {d.sent:>6} {d.failed:>7} {server.throttled - throttled:>6} "
+                  f"{d.retries:>8} {elapsed:>8.2f} {d.sent / elapsed:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# 📁 app/benchmarks/fake_graph.py
+#
+# Local stand-in for the WhatsApp Cloud API messages endpoint
+# (POST /<version>/<phone id>/messages). Answers after --latency seconds
+# and enforces a per-second rate limit like the real tier does, replying
+# 429 with Retry-After to anything over it. --failure-rate adds 503s.
+#
+#   python -m benchmarks.fake_graph --port 8790 --limit 80
+#   WHATSAPP_API_URL=http://127.0.0.1:8790/v17.0 WHATSAPP_TOKEN=x WHATSAPP_PHONE_ID=1 uvicorn main:app
+
+import argparse, json, random, sys, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class FakeGraphServer:
+    """Accepts WhatsApp text messages, at most limit per second."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05,
+                 limit: int = 80, failure_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.limit = limit
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.accepted = 0
+        self.throttled = 0
+        self.failed = 0
+        self._window = (0, 0)  # (second, requests in it)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._httpd.request_queue_size = 256
+
+    def _admit(self) -> str:
+        with self._lock:
+            second = int(time.time())
+            count = self._window[1] + 1 if self._window[0] == second else 1
+            self._window = (second, count)
+            if self.limit and count > self.limit:
+                self.throttled += 1
+                return "throttled"
+            if self.rng.random() < self.failure_rate:
+                self.failed += 1
+                return "failed"
+            self.accepted += 1
+            return "ok"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                time.sleep(server.latency)
+                outcome = server._admit() if self.path.endswith("/messages") else "missing"
+                headers = {}
+                if outcome == "ok":
+                    status, payload = 200, {"messaging_product": "whatsapp", "contacts": [{"wa_id": body.get("to")}],
+                                            "messages": [{"id": f"wamid.{server.accepted}"}]}
+                elif outcome == "throttled":
+                    status, payload = 429, {"error": {"code": 130429, "message": "Rate limit hit"}}
+                    headers["Retry-After"] = "1"
+                elif outcome == "failed":
+                    status, payload = 503, {"error": {"code": 2, "message": "Service temporarily unavailable"}}
+                else:
+                    status, payload = 404, {"error": {"message": "Unknown path"}}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v17.0"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake WhatsApp Cloud API server")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--limit", type=int, default=80, help="messages per second before 429s (0 = unlimited)")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    server = FakeGraphServer(port=args.port, latency=args.latency, limit=args.limit, failure_rate=args.failure_rate)
+    print(f"Fake Graph API listening on {server.base_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
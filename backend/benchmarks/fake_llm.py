@@ -0,0 +1,128 @@
+# 📁 app/benchmarks/fake_llm.py
+#
+# Local stand-in for the Gemini REST API (generateContent and SSE
+# streamGenerateContent) with a configurable response latency. For streams
+# the latency is spread over the chunks, like a model emitting tokens.
+# Point the backend at it with
+#
+#   python -m benchmarks.fake_llm --port 8766 --latency 0.5
+#   LLM_ENDPOINT=http://127.0.0.1:8766 uvicorn main:app
+
+import argparse, json, random, re, sys, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class FakeLLMServer:
+    """Answers generateContent with a canned markdown reply after latency seconds."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.5,
+                 jitter: float = 0.0, failure_rate: float = 0.0, seed: int = None, chunks: int = 8):
+        self.latency = latency
+        self.chunks = chunks
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.requests_served = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._httpd.request_queue_size = 256
+
+    def reply(self, prompt: str) -> str:
+        if "Return ONLY a JSON array" in prompt:
+            # Batched summaries (summary_worker.BATCH_PROMPT): one entry per "Article N"
+            count = len(re.findall(r"^Article \d+$", prompt, re.M))
+            return json.dumps([{"id": i, "summary": f"Summary {i}.\n- Point one\n- Point two"}
+                               for i in range(1, count + 1)])
+        return ("## Summary\n\nThis is a stand-in answer for benchmarking.\n\n"
+                "- First point\n- Second point\n\n1. Step one\n2. Step two\n\n"
+                f"Prompt length: {len(prompt)} characters.")
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if ":streamGenerateContent" in self.path:
+                    return self.stream(body)
+                time.sleep(server.latency + server.rng.uniform(0, server.jitter))
+                server.requests_served += 1
+                if server.rng.random() < server.failure_rate:
+                    payload = json.dumps({"error": {"code": 503, "message": "overloaded"}}).encode()
+                    self.send_response(503)
+                else:
+                    prompt = "".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+                    payload = json.dumps({"candidates": [{"content": {"parts": [{"text": server.reply(prompt)}]}}]}).encode()
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def stream(self, body):
+                prompt = "".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+                text = server.reply(prompt)
+                step = max(1, -(-len(text) // server.chunks))
+                delay = (server.latency + server.rng.uniform(0, server.jitter)) / server.chunks
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i in range(0, len(text), step):
+                    time.sleep(delay)
+                    chunk = {"candidates": [{"content": {"parts": [{"text": text[i:i + step]}]}}]}
+                    event = b"data: " + json.dumps(chunk).encode() + b"\r\n\r\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+                server.requests_served += 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Gemini generateContent server")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--chunks", type=int, default=8, help="chunks per streamed reply")
+    args = parser.parse_args(argv)
+    server = FakeLLMServer(port=args.port, latency=args.latency, jitter=args.jitter,
+                           failure_rate=args.failure_rate, chunks=args.chunks)
+    print(f"Fake LLM listening on {server.base_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
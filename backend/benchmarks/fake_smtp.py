@@ -0,0 +1,117 @@
+# 📁 app/benchmarks/fake_smtp.py
+#
+# Local SMTP stand-in: accepts any AUTH PLAIN login and every message,
+# counting what it receives. --rtt delays every reply like a network round
+# trip and --handshake delays the greeting, standing in for the TCP + TLS
+# setup a real relay costs per connection. --failure-rate answers some
+# MAIL commands with a temporary 451 to exercise retries.
+#
+#   python -m benchmarks.fake_smtp --port 8025 --rtt 0.02 --handshake 0.3
+#   SMTP_SERVER=127.0.0.1 SMTP_PORT=8025 SENDER_EMAIL=news@example.com SENDER_PASSWORD=x uvicorn main:app
+
+import argparse, random, socketserver, sys, threading, time
+
+
+class FakeSMTPServer:
+    """Speaks just enough ESMTP for smtplib: EHLO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rtt: float = 0.0, handshake: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = None):
+        self.rtt = rtt
+        self.handshake = handshake
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.connections = 0
+        self.messages = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    def _handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                if server.rtt:
+                    time.sleep(server.rtt)
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self):
+                with server._lock:
+                    server.connections += 1
+                time.sleep(server.handshake)
+                self.reply("220 fake-smtp ESMTP ready")
+                for raw in self.rfile:
+                    command = raw.decode("utf-8", "replace").strip()
+                    verb = command.split(" ", 1)[0].upper()
+                    if verb in ("EHLO", "HELO"):
+                        self.reply("250-fake-smtp\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+                    elif verb == "AUTH":
+                        self.reply("235 2.7.0 Authentication successful")
+                    elif verb == "MAIL":
+                        if server.rng.random() < server.failure_rate:
+                            with server._lock:
+                                server.rejected += 1
+                            self.reply("451 4.3.0 Try again later")
+                        else:
+                            self.reply("250 OK")
+                    elif verb == "RCPT":
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        for line in self.rfile:
+                            if line in (b".\r\n", b".\n"):
+                                break
+                        with server._lock:
+                            server.messages += 1
+                        self.reply("250 OK queued")
+                    elif verb in ("RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        return Handler
+
+    @property
+    def address(self):
+        return self._server.server_address[:2]
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake SMTP relay")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--rtt", type=float, default=0.02, help="seconds before every reply")
+    parser.add_argument("--handshake", type=float, default=0.3, help="seconds before the greeting")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    server = FakeSMTPServer(port=args.port, rtt=args.rtt, handshake=args.handshake,
+                            failure_rate=args.failure_rate)
+    print("Fake SMTP listening on {}:{}".format(*server.address))
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
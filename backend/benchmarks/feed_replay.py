@@ -0,0 +1,267 @@
+# 📁 app/benchmarks/feed_replay.py
+#
+# Record real RSS payloads for every source in RSS_FEEDS and replay them from
+# a local HTTP server, so the ingest pipeline can be exercised offline.
+#
+#   python -m benchmarks.feed_replay record            # capture live feeds
+#   python -m benchmarks.feed_replay serve --port 8765 # serve fixtures
+
+import argparse, json, os, random, re, sys, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from xml.sax.saxutils import escape
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MANIFEST = "manifest.json"
+
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def load_manifest(fixtures_dir: str = FIXTURES_DIR) -> dict:
+    """Source name -> fixture file name."""
+    try:
+        with open(os.path.join(fixtures_dir, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest: dict, fixtures_dir: str):
+    with open(os.path.join(fixtures_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def record(fixtures_dir: str = FIXTURES_DIR, timeout: float = 15):
+    """Download every feed in RSS_FEEDS and store the raw payloads on disk."""
+    import requests
+    from scraping.fetcher import RSS_FEEDS, FEED_HEADERS
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    manifest = load_manifest(fixtures_dir)
+    for name, url in RSS_FEEDS.items():
+        filename = f"{slugify(name)}.xml"
+        try:
+            response = requests.get(url, headers=FEED_HEADERS, timeout=timeout)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"⚠️ Could not record {name}: {e}")
+            continue
+        with open(os.path.join(fixtures_dir, filename), "wb") as f:
+            f.write(response.content)
+        manifest[name] = filename
+        print(f"✅ Recorded {name} ({len(response.content)} bytes)")
+    _write_manifest(manifest, fixtures_dir)
+    return manifest
+
+
+def generate_synthetic(fixtures_dir: str = FIXTURES_DIR, items_per_feed: int = 50, seed: int = 42):
+    """Write deterministic stand-in feeds for sources that have no recording."""
+    from scraping.fetcher import RSS_FEEDS
+
+    rng = random.Random(seed)
+    words = ("government market cricket election hospital startup monsoon court "
+             "budget minister film student police river festival rupee metro").split()
+    os.makedirs(fixtures_dir, exist_ok=True)
+    manifest = load_manifest(fixtures_dir)
+    for name in RSS_FEEDS:
+        if name in manifest and os.path.exists(os.path.join(fixtures_dir, manifest[name])):
+            continue
+        items = []
+        for i in range(items_per_feed):
+            title = " ".join(rng.choice(words) for _ in range(8)).capitalize()
+            body = " ".join(rng.choice(words) for _ in range(60))
+            summary = f"<p><img src='x.jpg'/>{body} &amp; more</p>" if i % 2 else body
+            items.append(
+                "<item>"
+                f"<title>{escape(title)} {i}</title>"
+                f"<link>https://example.com/{slugify(name)}/{i}</link>"
+                f"<description>{escape(summary)}</description>"
+                f"<pubDate>Wed, 17 Sep 2025 {i % 24:02d}:00:00 +0000</pubDate>"
+                "</item>"
+            )
+        filename = f"{slugify(name)}.xml"
+        with open(os.path.join(fixtures_dir, filename), "w", encoding="utf-8") as f:
+            f.write(f'<?xml version="1.0"?><rss version="2.0"><channel><title>{escape(name)}</title>'
+                    + "".join(items) + "</channel></rss>")
+        manifest[name] = filename
+    _write_manifest(manifest, fixtures_dir)
+    return manifest
+
+
+def _shuffle_words(match, rng):
+    words = match.group(2).split(" ")
+    rng.shuffle(words)
+    return match.group(1) + " ".join(words) + match.group(3)
+
+
+def amplify(payload: bytes, min_items: int) -> bytes:
+    """Repeat <item> blocks until the feed has min_items.
+
+    Copies get a unique title and link and a reshuffled description so the ingest
+    dedup stage treats them as distinct stories.
+    """
+    text = payload.decode("utf-8", errors="replace")
+    items = re.findall(r"<item[\s>].*?</item>", text, flags=re.S)
+    if not items or len(items) >= min_items:
+        return payload
+    rng = random.Random(min_items)
+    extra = []
+    copy = 1
+    while len(items) + len(extra) < min_items:
+        for item in items:
+            if len(items) + len(extra) >= min_items:
+                break
+            item = re.sub(r"(<title>(?:<!\[CDATA\[)?)", rf"\1[{copy}] ", item, count=1)
+            item = re.sub(r"((?:\]\]>)?</link>)", rf"/copy-{copy}\1", item, count=1)
+            item = re.sub(r"(<description>(?:<!\[CDATA\[)?)(.*?)((?:\]\]>)?</description>)",
+                          lambda m: _shuffle_words(m, rng), item, count=1, flags=re.S)
+            extra.append(item)
+        copy += 1
+    close = text.rfind("</channel>")
+    return (text[:close] + "".join(extra) + text[close:]).encode("utf-8")
+
+
+class ReplayServer:
+    """Local HTTP stand-in for the RSS sources.
+
+    latency/jitter are in seconds; failure_rate is the share of requests
+    answered with HTTP 500; timeout_rate is the share that stall for
+    stall_seconds before answering. Feeds are padded to min_items entries,
+    or to ?items=N when the request asks for more.
+    """
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0,
+                 timeout_rate: float = 0.0, stall_seconds: float = 30.0, min_items: int = 0, seed: int = None):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.timeout_rate = timeout_rate
+        self.stall_seconds = stall_seconds
+        self.min_items = min_items
+        self.rng = random.Random(seed)
+        self.requests_served = 0
+        self._payloads = {}
+        self._amplified = {}
+        self._load()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    def _load(self):
+        manifest = load_manifest(self.fixtures_dir)
+        for name, filename in manifest.items():
+            with open(os.path.join(self.fixtures_dir, filename), "rb") as f:
+                payload = f.read()
+            if self.min_items:
+                payload = amplify(payload, self.min_items)
+            self._payloads[f"/{slugify(name)}.xml"] = (name, payload)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests_served += 1
+                delay = server.latency + server.rng.uniform(0, server.jitter)
+                if server.rng.random() < server.timeout_rate:
+                    delay += server.stall_seconds
+                if delay:
+                    time.sleep(delay)
+                url = urlsplit(self.path)
+                found = server._payloads.get(url.path)
+                if found is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if server.rng.random() < server.failure_rate:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                items = int(parse_qs(url.query).get("items", ["0"])[0])
+                payload = server.payload(url.path, items)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def payload(self, path: str, items: int = 0) -> bytes:
+        payload = self._payloads[path][1]
+        if items <= self.min_items:
+            return payload
+        key = (path, items)
+        if key not in self._amplified:
+            self._amplified[key] = amplify(payload, items)
+        return self._amplified[key]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def feed_urls(self, items: int = 0) -> dict:
+        """Drop-in replacement for RSS_FEEDS pointing at this server."""
+        query = f"?items={items}" if items else ""
+        return {name: self.base_url + path + query for path, (name, _) in self._payloads.items()}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay RSS feeds")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("record", help="capture live payloads for every RSS_FEEDS source")
+    synth = sub.add_parser("synthesize", help="write stand-in feeds for unrecorded sources")
+    synth.add_argument("--items", type=int, default=50)
+    serve = sub.add_parser("serve", help="serve recorded payloads over HTTP")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0)
+    serve.add_argument("--jitter", type=float, default=0.0)
+    serve.add_argument("--failure-rate", type=float, default=0.0)
+    serve.add_argument("--timeout-rate", type=float, default=0.0)
+    serve.add_argument("--min-items", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        record()
+    elif args.command == "synthesize":
+        generate_synthetic(items_per_feed=args.items)
+    else:
+        server = ReplayServer(port=args.port, latency=args.latency, jitter=args.jitter,
+                              failure_rate=args.failure_rate, timeout_rate=args.timeout_rate,
+                              min_items=args.min_items)
+        print(f"Serving {len(server.feed_urls())} feeds on {server.base_url}")
+        for name, url in sorted(server.feed_urls().items()):
+            print(f"  {name}: {url}")
+        server.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import os
+import threading
+from datetime import datetime
+
+from search_index import article_index
+
+MAX_ARTICLES = int(os.getenv("CHAT_CONTEXT_ARTICLES", "40"))
+TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKENS", "1000"))
+POOL_SIZE = int(os.getenv("CHAT_CONTEXT_POOL", "500"))  # recent articles kept for category selection
+RELEVANT_K = 10
+HEADER = "\nRECENT NEWS CONTEXT:\n"
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; close enough for a budget
+    return (len(text) + 3) // 4
+
+
+def context_line(article: dict) -> str:
+    return f"[{article.get('category', 'Other')}] {article.get('title')} ({article.get('source')})"
+
+
+def build_block(articles, budget: int = TOKEN_BUDGET, limit: int = MAX_ARTICLES) -> str:
+    """Numbered context block over articles, stopping at the token budget."""
+    lines, used, seen = [], estimate_tokens(HEADER), set()
+    for article in articles:
+        title = article.get("title")
+        if not title or title in seen:
+            continue
+        line = f"{len(lines) + 1}. {context_line(article)}"
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        seen.add(title)
+        lines.append(line)
+        used += cost
+        if len(lines) >= limit:
+            break
+    return HEADER + "\n".join(lines) + "\n" if lines else ""
+
+
+class ChatContext:
+    """Materialized "RECENT NEWS CONTEXT" block for /chat.
+
+    Holds the newest articles in memory and rebuilds the default block
+    only when ingest adds articles, so a chat turn reads a ready string
+    instead of querying MongoDB. Category blocks are built on first use
+    and kept until the next change; query-relevant blocks pull the best
+    matches from the BM25 index before filling up with recent news.
+    """
+
+    def __init__(self, max_articles: int = MAX_ARTICLES, budget: int = TOKEN_BUDGET, pool_size: int = POOL_SIZE):
+        self.max_articles = max_articles
+        self.budget = budget
+        self.pool_size = pool_size
+        self._recent = []        # newest first, by published_at
+        self._block = ""
+        self._by_category = {}   # category -> block, cleared on every change
+        self._lock = threading.Lock()
+        self.version = 0
+        self.rebuilds = 0
+        self.served = 0
+
+    def _rebuild(self):
+        self._block = build_block(self._recent, self.budget, self.max_articles)
+        self._by_category = {}
+        self.version += 1
+        self.rebuilds += 1
+
+    def load(self, collection):
+        """Seed from the newest stored articles."""
+        cursor = collection.find(
+            {}, {"_id": 0, "title": 1, "source": 1, "category": 1, "published_at": 1}
+        ).sort([("published_at", -1), ("_id", -1)]).limit(self.pool_size)  # indexed, unlike fetched_at
+        articles = list(cursor)
+        with self._lock:
+            self._recent = articles
+            self._rebuild()
+        return len(articles)
+
+    def add_many(self, articles):
+        """Fold newly ingested articles in; no-op (and no rebuild) when there are none."""
+        fresh = [
+            {k: a.get(k) for k in ("title", "source", "category", "published_at")}
+            for a in articles if a.get("title")
+        ]
+        if not fresh:
+            return
+        with self._lock:
+            titles = {a["title"] for a in fresh}
+            merged = fresh + [a for a in self._recent if a.get("title") not in titles]
+            # Same order as load(), so the pool is cut by one key throughout
+            merged.sort(key=lambda a: a.get("published_at") or datetime.min, reverse=True)
+            self._recent = merged[:self.pool_size]
+            self._rebuild()
+
+    def block(self, query: str = None, category: str = None, relevant: bool = False) -> str:
+        self.served += 1
+        if relevant and query:
+            hits = article_index.search(query, k=RELEVANT_K)
+            if category:
+                hits = [a for a in hits if a.get("category") == category]
+            with self._lock:
+                recent = [a for a in self._recent if not category or a.get("category") == category]
+            return build_block(hits + recent, self.budget, self.max_articles)
+        if category:
+            with self._lock:
+                cached = self._by_category.get(category)
+                if cached is None:
+                    cached = build_block(
+                        (a for a in self._recent if a.get("category") == category),
+                        self.budget, self.max_articles
+                    )
+                    self._by_category[category] = cached
+                return cached
+        return self._block
+
+    def stats(self) -> dict:
+        return {
+            "articles": len(self._recent),
+            "version": self.version,
+            "rebuilds": self.rebuilds,
+            "served": self.served,
+            "tokens": estimate_tokens(self._block),
+            "budget": self.budget,
+        }
+
+
+# Shared block: loaded at startup, refreshed by every ingest batch that adds articles
+chat_context = ChatContext()
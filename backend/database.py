@@ -0,0 +1,152 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+load_dotenv()
+load_dotenv("../.env")
+
+MONGODB_URI = os.getenv("MONGODB_URI")
+DB_NAME = os.getenv("MONGODB_DB", "news")
+MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+TIMEOUT_MS = int(os.getenv("MONGODB_TIMEOUT_MS", "5000"))
+RECONNECT_INTERVAL = float(os.getenv("MONGODB_RECONNECT_INTERVAL", "5"))   # seconds between pings while down
+HEALTH_INTERVAL = float(os.getenv("MONGODB_HEALTH_INTERVAL", "30"))        # seconds between pings while up
+
+
+class Database:
+    """The process-wide MongoDB client.
+
+    The client is created without connecting, so importing a module that
+    needs the database never blocks. A background thread pings the server
+    and keeps `available` current; whenever it (re)connects, the
+    registered on_connect hooks run (index creation, startup backfills),
+    so an outage recovers without restarting the process.
+    """
+
+    def __init__(self, uri: str = MONGODB_URI, name: str = DB_NAME):
+        self.uri = uri
+        self.name = name
+        self.available = False
+        self.last_error = None
+        self.connects = 0
+        self._client = None
+        self._hooks = []
+        self._lock = threading.Lock()
+        self._connected = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # One worker per pooled connection: async handlers await queries here instead
+        # of blocking the event loop, and the default executor is sized by CPU count
+        self._executor = ThreadPoolExecutor(max_workers=MAX_POOL_SIZE, thread_name_prefix="mongo")
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.uri)
+
+    def client(self):
+        if self._client is None and self.configured:
+            with self._lock:
+                if self._client is None:
+                    self._client = MongoClient(
+                        self.uri,
+                        maxPoolSize=MAX_POOL_SIZE,
+                        minPoolSize=MIN_POOL_SIZE,
+                        serverSelectionTimeoutMS=TIMEOUT_MS,
+                        connect=False,
+                    )
+        return self._client
+
+    def collection(self, name: str):
+        """Collection handle, or None when no MONGODB_URI is configured."""
+        client = self.client()
+        return client[self.name][name] if client is not None else None
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking pymongo call off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    def on_connect(self, hook):
+        """Run hook() now if connected, and after every (re)connect."""
+        self._hooks.append(hook)
+        if self.available:
+            self._run_hook(hook)
+        return hook
+
+    def _run_hook(self, hook):
+        try:
+            hook()
+        except Exception as e:
+            print(f"⚠️ MongoDB on_connect hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+    def check(self) -> bool:
+        """Ping the server once and update `available`."""
+        if not self.configured:
+            self.last_error = "MONGODB_URI not set"
+            return False
+        try:
+            self.client().admin.command("ping")
+        except PyMongoError as e:
+            if self.available:
+                print(f"⚠️ MongoDB connection lost - {e}")
+            self.available = False
+            self.last_error = str(e)
+            self._connected.clear()
+            return False
+        if not self.available:
+            self.available = True
+            self.last_error = None
+            self.connects += 1
+            print("✅ MongoDB connected")
+            for hook in list(self._hooks):
+                self._run_hook(hook)
+            self._connected.set()
+        return True
+
+    def _monitor(self):
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(HEALTH_INTERVAL if self.available else RECONNECT_INTERVAL)
+
+    def start(self):
+        """Connect in the background and keep watching the connection."""
+        if not self.configured:
+            print("⚠️ MONGODB_URI not set, running without database storage")
+            return
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._monitor, name="mongo-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until connected (for scripts); starts the monitor if needed."""
+        self.start()
+        return self._connected.wait(timeout) if self.configured else False
+
+    def stats(self) -> dict:
+        return {
+            "configured": self.configured,
+            "available": self.available,
+            "connects": self.connects,
+            "max_pool_size": MAX_POOL_SIZE,
+            "min_pool_size": MIN_POOL_SIZE,
+            "last_error": self.last_error,
+        }
+
+
+# Shared by the scraper, the routers and the startup jobs
+db = Database()
@@ -0,0 +1,249 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from database import db
+from mailer import mailer
+from whatsapp import whatsapp
+
+DIGEST_HOUR = int(os.getenv("DIGEST_HOUR", "7"))               # UTC hour of the daily run; -1 disables it
+ARTICLES_PER_DIGEST = int(os.getenv("DIGEST_ARTICLES", "5"))
+LOOKBACK_HOURS = float(os.getenv("DIGEST_LOOKBACK_HOURS", "24"))
+CANDIDATES = int(os.getenv("DIGEST_CANDIDATES", "500"))         # newest articles considered per run
+USER_BATCH = int(os.getenv("DIGEST_USER_BATCH", "1000"))        # users per history query
+MAX_QUEUED = int(os.getenv("DIGEST_MAX_QUEUED", "2000"))        # pause while a delivery queue is this deep
+RUN_WINDOW = float(os.getenv("DIGEST_WINDOW", "3600"))          # seconds a run may take before it stops
+
+
+class DigestEngine:
+    """Daily personalized digests for every subscribed user.
+
+    One query loads the candidate articles (newest within the lookback,
+    grouped by category). Subscribers are then streamed in batches; each
+    batch costs a single reading_history query, served by the
+    (user_email, read_at) index, to drop what its users already read.
+    Rendered messages go to the mailer / WhatsApp queues, which are
+    allowed to drain when they get too deep, so memory stays bounded.
+    A user's last_sent_at is stamped per batch: a run that stops at its
+    window, or a restart, resumes with the users not served yet. Users
+    whose channel is not configured are left unstamped, and a run with
+    no configured channel at all is refused.
+    """
+
+    def __init__(self, articles_per_digest: int = ARTICLES_PER_DIGEST, user_batch: int = USER_BATCH,
+                 email=mailer, whatsapp_sender=whatsapp):
+        self.articles_per_digest = articles_per_digest
+        self.user_batch = user_batch
+        self.channels = {"email": email, "whatsapp": whatsapp_sender}
+        self.render = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.running = False
+        self.runs = 0
+        self.next_run = None
+        self.last_run = None
+        self.last_error = None
+
+    # -- selection -------------------------------------------------------
+
+    @staticmethod
+    def subscribers_query(cutoff: str) -> dict:
+        return {
+            "preferences.digest.enabled": True,
+            "$or": [
+                {"preferences.digest.last_sent_at": {"$exists": False}},
+                {"preferences.digest.last_sent_at": {"$lt": cutoff}},
+            ],
+        }
+
+    def candidates(self, articles_collection, now: datetime):
+        """category -> newest articles first, from one query."""
+        cursor = articles_collection.find(
+            {"published_at": {"$gte": now - timedelta(hours=LOOKBACK_HOURS)}},
+            {"_id": 0, "title": 1, "summary": 1, "link": 1, "source": 1, "category": 1, "published": 1}
+        ).sort([("published_at", -1), ("_id", -1)]).limit(CANDIDATES)
+        by_category = {}
+        for article in cursor:
+            by_category.setdefault(article.get("category") or "Other", []).append(article)
+        return by_category
+
+    def pick(self, by_category: dict, categories, read: set):
+        """Newest unread articles across the user's categories (all when they chose none)."""
+        pools = [by_category.get(c, []) for c in categories] if categories else list(by_category.values())
+        picked = []
+        # Take from each category in turn so one busy category can't fill the whole digest
+        for rank in range(max(map(len, pools), default=0)):
+            for pool in pools:
+                if rank < len(pool) and pool[rank]["title"] not in read:
+                    picked.append(pool[rank])
+                    if len(picked) == self.articles_per_digest:
+                        return picked
+        return picked
+
+    # -- run -------------------------------------------------------------
+
+    def _wait_for_channel(self, channel, deadline):
+        sender = self.channels[channel]
+        while sender.backlog() > MAX_QUEUED and time.monotonic() < deadline and not self._stop.is_set():
+            time.sleep(0.05)
+
+    def unconfigured_channels(self) -> list:
+        return [name for name, sender in self.channels.items() if not getattr(sender, "configured", True)]
+
+    def _deliver(self, user, articles, deadline):
+        digest = user["preferences"]["digest"]
+        channel = digest.get("channel", "email")
+        if channel == "whatsapp":
+            if not digest.get("whatsapp"):
+                return False
+            self._wait_for_channel(channel, deadline)
+            self.channels[channel].submit(digest["whatsapp"], self.render["whatsapp"](articles))
+        else:
+            self._wait_for_channel("email", deadline)
+            self.channels["email"].submit(
+                user["email"],
+                f"📰 Your Taaza Khabar digest - {len(articles)} Articles",
+                self.render["email"](articles)
+            )
+        return True
+
+    def run(self, users_collection=None, history_collection=None, articles_collection=None,
+            window: float = RUN_WINDOW) -> dict:
+        """One fan-out over every subscriber not yet served today; returns the run report."""
+        if users_collection is None:
+            users_collection = db.collection("users")
+        if history_collection is None:
+            history_collection = db.collection("reading_history")
+        if articles_collection is None:
+            articles_collection = db.collection("articles")
+        with self._lock:
+            if self.running:
+                return {"skipped": "already running"}
+            self.running = True
+        started = time.monotonic()
+        deadline = started + window
+        now = datetime.utcnow()
+        report = {"started_at": now.isoformat(), "users": 0, "sent": 0, "empty": 0, "unconfigured": 0,
+                  "batches": 0, "complete": False}
+        try:
+            unconfigured = self.unconfigured_channels()
+            report["unconfigured_channels"] = unconfigured
+            if len(unconfigured) == len(self.channels):
+                raise RuntimeError("no delivery channel is configured (SMTP or WhatsApp credentials)")
+            by_category = self.candidates(articles_collection, now)
+            report["candidates"] = sum(map(len, by_category.values()))
+            # A candidate can only have been read after it was published, i.e. within the lookback
+            since = (now - timedelta(hours=LOOKBACK_HOURS)).isoformat()
+            cutoff = (now - timedelta(hours=20)).isoformat()  # once a day, with slack for the schedule
+            cursor = users_collection.find(
+                self.subscribers_query(cutoff),
+                {"_id": 0, "email": 1, "preferences.categories": 1, "preferences.digest": 1}
+            ).batch_size(self.user_batch)
+            batch = []
+            for user in cursor:
+                batch.append(user)
+                if len(batch) == self.user_batch:
+                    self._run_batch(batch, by_category, since, users_collection, history_collection, report, deadline)
+                    batch = []
+                    if time.monotonic() >= deadline or self._stop.is_set():
+                        break
+            else:
+                if batch:
+                    self._run_batch(batch, by_category, since, users_collection, history_collection, report, deadline)
+                report["complete"] = True
+        except Exception as e:
+            self.last_error = str(e)
+            report["error"] = str(e)
+            print(f"⚠️ Digest run failed: {e}")
+        finally:
+            elapsed = time.monotonic() - started
+            report["seconds"] = round(elapsed, 2)
+            report["users_per_sec"] = round(report["users"] / elapsed, 1) if elapsed else 0.0
+            self.last_run = report
+            self.runs += 1
+            self.running = False
+        if report["unconfigured"]:
+            print(f"⚠️ Digest skipped {report['unconfigured']} subscribers whose channel is not configured "
+                  f"({', '.join(report['unconfigured_channels'])})")
+        if not report["complete"] and "error" not in report:
+            print(f"⚠️ Digest run stopped after {report['seconds']}s with {report['users']} users served; "
+                  "the rest go out on the next run")
+        return report
+
+    def _run_batch(self, users, by_category, since, users_collection, history_collection, report, deadline):
+        skipped = set(self.unconfigured_channels())
+        deliverable = [u for u in users if u["preferences"]["digest"].get("channel", "email") not in skipped]
+        # The rest are not stamped, so they get today's digest once their channel is set up
+        report["unconfigured"] += len(users) - len(deliverable)
+        read = {}
+        if by_category and deliverable:
+            for entry in history_collection.find(
+                {"user_email": {"$in": [u["email"] for u in deliverable]}, "read_at": {"$gte": since}},
+                {"_id": 0, "user_email": 1, "article_title": 1}
+            ):
+                read.setdefault(entry["user_email"], set()).add(entry["article_title"])
+        served = []
+        for user in deliverable:
+            articles = self.pick(by_category, user.get("preferences", {}).get("categories"),
+                                 read.get(user["email"], set()))
+            if articles and self._deliver(user, articles, deadline):
+                report["sent"] += 1
+            else:
+                report["empty"] += 1
+            served.append(user["email"])
+        # Stamped even when there was nothing new, so the user isn't reconsidered until tomorrow
+        if served:
+            users_collection.update_many(
+                {"email": {"$in": served}},
+                {"$set": {"preferences.digest.last_sent_at": datetime.utcnow().isoformat()}}
+            )
+        report["users"] += len(users)
+        report["batches"] += 1
+
+    # -- schedule --------------------------------------------------------
+
+    def _next_due(self, now: datetime) -> datetime:
+        due = now.replace(hour=DIGEST_HOUR, minute=0, second=0, microsecond=0)
+        return due if due > now else due + timedelta(days=1)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            due = self._next_due(datetime.utcnow())
+            self.next_run = due.isoformat()
+            if self._stop.wait((due - datetime.utcnow()).total_seconds()):
+                break
+            if db.available:
+                report = self.run()
+                print(f"📬 Digest run: {report.get('sent', 0)} sent to {report.get('users', 0)} users "
+                      f"in {report.get('seconds')}s")
+
+    def start(self, render_email, render_whatsapp):
+        """Schedule the daily run; render_* turn a list of articles into a message body."""
+        self.render = {"email": render_email, "whatsapp": render_whatsapp}
+        if DIGEST_HOUR < 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="digest", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "scheduled": self._thread is not None,
+            "running": self.running,
+            "runs": self.runs,
+            "next_run": self.next_run,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+        }
+
+
+# Shared engine: scheduled with the app, runnable on demand via /digest/run
+digest_engine = DigestEngine()
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import google.generativeai as genai
+import requests
+
+DEFAULT_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+RETRIES = int(os.getenv("LLM_RETRIES", "2"))
+BACKOFF = float(os.getenv("LLM_BACKOFF", "0.5"))  # seconds, doubled per attempt
+# Point at a local stand-in (see benchmarks/fake_llm.py) instead of the Gemini SDK
+LLM_ENDPOINT = os.getenv("LLM_ENDPOINT")
+
+# Per-endpoint concurrency caps, within the global one
+ENDPOINT_LIMITS = {"chat": 8, "summarize": 4, "related": 4}
+
+_TRANSIENT_ERRORS = {
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "TooManyRequests", "TimeoutError", "ConnectionError", "ConnectTimeout", "ReadTimeout",
+}
+
+
+class LLMError(Exception):
+    pass
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and (status == 429 or status >= 500):
+        return True
+    return type(error).__name__ in _TRANSIENT_ERRORS
+
+
+class GeminiBackend:
+    """google-generativeai SDK, one GenerativeModel instance per model name."""
+
+    def __init__(self):
+        self._models = {}
+
+    def model(self, name: str):
+        if name not in self._models:
+            self._models[name] = genai.GenerativeModel(name)
+        return self._models[name]
+
+    async def generate(self, prompt: str, model: str) -> str:
+        response = await self.model(model).generate_content_async(prompt)
+        return response.text
+
+    async def stream(self, prompt: str, model: str):
+        response = await self.model(model).generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class RestBackend:
+    """Gemini REST request shape against any base URL, over a pooled session."""
+
+    def __init__(self, endpoint: str, api_key: str = None, max_workers: int = MAX_CONCURRENCY):
+        self.endpoint = endpoint.rstrip("/")
+        self.api_key = api_key
+        # Own executor: the loop's default one is sized by CPU count, not by I/O concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, prompt: str, model: str) -> str:
+        response = self.session.post(
+            f"{self.endpoint}/v1beta/models/{model}:generateContent",
+            params={"key": self.api_key} if self.api_key else None,
+            json={"contents": [{"parts": [{"text": prompt}]}]},
+            timeout=TIMEOUT,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return "".join(part.get("text", "") for part in data["candidates"][0]["content"]["parts"])
+
+    async def generate(self, prompt: str, model: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._post, prompt, model)
+
+    def _open_stream(self, prompt: str, model: str):
+        response = self.session.post(
+            f"{self.endpoint}/v1beta/models/{model}:streamGenerateContent",
+            params={"alt": "sse", **({"key": self.api_key} if self.api_key else {})},
+            json={"contents": [{"parts": [{"text": prompt}]}]},
+            timeout=TIMEOUT,
+            stream=True,
+        )
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _next_chunk(lines):
+        # One SSE "data:" event per candidate chunk; None once the stream ends
+        for line in lines:
+            if line.startswith(b"data:"):
+                data = json.loads(line[5:])
+                return "".join(part.get("text", "") for part in data["candidates"][0]["content"]["parts"])
+        return None
+
+    async def stream(self, prompt: str, model: str):
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(self._executor, self._open_stream, prompt, model)
+        try:
+            lines = response.iter_lines(chunk_size=None)  # yield events as they arrive, not per 512 bytes
+            while True:
+                text = await loop.run_in_executor(self._executor, self._next_chunk, lines)
+                if text is None:
+                    break
+                if text:
+                    yield text
+        finally:
+            response.close()
+
+
+class LLMClient:
+    """Shared async LLM client.
+
+    Bounds concurrency globally and per endpoint, applies a timeout and
+    retries transient failures with jittered exponential backoff. Records
+    queue depth and latency so saturation is visible on /llm/stats.
+    """
+
+    def __init__(self, backend=None, max_concurrency: int = MAX_CONCURRENCY, timeout: float = TIMEOUT,
+                 retries: int = RETRIES, backoff: float = BACKOFF, endpoint_limits: dict = None):
+        self.backend = backend or (RestBackend(LLM_ENDPOINT, os.getenv("GEMINI_API_KEY")) if LLM_ENDPOINT else GeminiBackend())
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self.endpoint_limits = dict(ENDPOINT_LIMITS if endpoint_limits is None else endpoint_limits)
+        self._global = None
+        self._endpoints = {}
+        self.waiting = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retried = 0
+        self.streams = 0
+        self._latencies = deque(maxlen=1000)
+        self._first_chunk = deque(maxlen=1000)
+
+    def _semaphores(self, endpoint: str):
+        # Created lazily so they bind to the running event loop
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_concurrency)
+        if endpoint not in self._endpoints:
+            limit = self.endpoint_limits.get(endpoint, self.max_concurrency)
+            self._endpoints[endpoint] = asyncio.Semaphore(limit)
+        return self._global, self._endpoints[endpoint]
+
+    async def _acquire(self, endpoint: str):
+        global_sem, endpoint_sem = self._semaphores(endpoint)
+        self.waiting += 1
+        try:
+            await endpoint_sem.acquire()
+            try:
+                await global_sem.acquire()
+            except BaseException:
+                endpoint_sem.release()
+                raise
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return global_sem, endpoint_sem
+
+    def _release(self, semaphores):
+        self.in_flight -= 1
+        for sem in semaphores:
+            sem.release()
+
+    async def generate(self, prompt: str, endpoint: str = "default", model: str = DEFAULT_MODEL) -> str:
+        """Generate a completion, waiting for a free slot first."""
+        attempt = 0
+        while True:
+            semaphores = await self._acquire(endpoint)
+            started = time.perf_counter()
+            try:
+                text = await asyncio.wait_for(self.backend.generate(prompt, model), self.timeout)
+                self.calls += 1
+                self._latencies.append(time.perf_counter() - started)
+                return text
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                if attempt >= self.retries or not _is_transient(e):
+                    self.errors += 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise LLMError(f"LLM call timed out after {self.timeout}s") from e
+                    raise
+            finally:
+                self._release(semaphores)
+            # Back off outside the semaphores so other requests can proceed
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+
+    async def stream(self, prompt: str, endpoint: str = "default", model: str = DEFAULT_MODEL):
+        """Yield completion text chunks as the model produces them.
+
+        Holds one slot for the whole stream. The timeout applies per chunk,
+        and transient failures are only retried before the first chunk,
+        since what was already yielded can't be taken back.
+        """
+        attempt = 0
+        while True:
+            semaphores = await self._acquire(endpoint)
+            started = time.perf_counter()
+            chunks = self.backend.stream(prompt, model)
+            yielded = False
+            try:
+                while True:
+                    try:
+                        text = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    if not yielded:
+                        self._first_chunk.append(time.perf_counter() - started)
+                        yielded = True
+                    yield text
+                self.calls += 1
+                self.streams += 1
+                self._latencies.append(time.perf_counter() - started)
+                return
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                if yielded or attempt >= self.retries or not _is_transient(e):
+                    self.errors += 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise LLMError(f"LLM stream stalled for {self.timeout}s") from e
+                    raise
+            finally:
+                await chunks.aclose()
+                self._release(semaphores)
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        first_chunk = sorted(self._first_chunk)
+
+        def pct(p, values=latencies):
+            return round(values[min(len(values) - 1, int(p / 100 * len(values)))] * 1000, 1) if values else 0.0
+
+        return {
+            "backend": type(self.backend).__name__,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "endpoint_limits": self.endpoint_limits,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "retries": self.retried,
+            "streams": self.streams,
+            "latency_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99)},
+            "first_chunk_ms": {"p50": pct(50, first_chunk), "p95": pct(95, first_chunk)},
+        }
+
+
+llm = LLMClient()
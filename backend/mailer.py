@@ -0,0 +1,267 @@
+import itertools
+import os
+import queue
+import smtplib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from dotenv import load_dotenv
+
+load_dotenv()
+load_dotenv("../.env")
+
+SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
+SENDER_EMAIL = os.getenv("SENDER_EMAIL")
+SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
+POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))             # persistent SMTP sessions
+BATCH_SIZE = int(os.getenv("SMTP_BATCH_SIZE", "50"))          # messages sent per session checkout
+MAX_ATTEMPTS = int(os.getenv("SMTP_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF = float(os.getenv("SMTP_RETRY_BACKOFF", "2"))   # seconds, doubled per attempt
+IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))    # servers drop idle sessions; reconnect after this
+TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+JOB_HISTORY = int(os.getenv("SMTP_JOB_HISTORY", "1000"))      # finished jobs kept for the status endpoint
+
+
+class _Job:
+    __slots__ = ("id", "to", "subject", "html", "status", "attempts", "error", "created_at", "sent_at")
+
+    def __init__(self, job_id, to, subject, html):
+        self.id = job_id
+        self.to = to
+        self.subject = subject
+        self.html = html
+        self.status = "queued"
+        self.attempts = 0
+        self.error = None
+        self.created_at = datetime.utcnow().isoformat()
+        self.sent_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "to": self.to,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "sent_at": self.sent_at,
+        }
+
+
+class _Session:
+    """One SMTP connection, kept open (STARTTLS and login done once) across many messages."""
+
+    def __init__(self, mailer):
+        self.mailer = mailer
+        self.smtp = None
+        self.last_used = 0.0
+
+    def connect(self):
+        self.close()
+        m = self.mailer
+        smtp = smtplib.SMTP(m.host, m.port, timeout=TIMEOUT)
+        smtp.ehlo()
+        if m.starttls and smtp.has_extn("starttls"):
+            smtp.starttls()
+            smtp.ehlo()
+        if m.password:
+            smtp.login(m.sender, m.password)
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        m.connections += 1
+
+    def ensure(self):
+        if self.smtp is None or time.monotonic() - self.last_used > IDLE_TIMEOUT:
+            self.connect()
+        else:
+            self.mailer.reused += 1
+
+    def send(self, msg):
+        self.smtp.send_message(msg)
+        self.last_used = time.monotonic()
+
+    def close(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.smtp = None
+
+
+class Mailer:
+    """Queued email delivery over a small pool of persistent SMTP sessions.
+
+    /send-email only enqueues a job and returns its id. Each worker
+    thread owns one SMTP session and, per wakeup, sends everything
+    queued (up to a batch) over it, so the connect/STARTTLS/login
+    handshake is paid once per session rather than once per message.
+    Temporary failures are retried with exponential backoff; permanent
+    (5xx) rejections fail the job straight away.
+    """
+
+    def __init__(self, host: str = SMTP_SERVER, port: int = SMTP_PORT, sender: str = SENDER_EMAIL,
+                 password: str = SENDER_PASSWORD, pool_size: int = POOL_SIZE, batch_size: int = BATCH_SIZE,
+                 starttls: bool = SMTP_STARTTLS):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.password = password
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.starttls = starttls
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()  # job_id -> _Job, oldest first
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.connections = 0
+        self.reused = 0
+        self.last_error = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.sender and self.password)
+
+    # -- producer side ----------------------------------------------------
+
+    def submit(self, to: str, subject: str, html: str) -> dict:
+        job = _Job(f"{int(time.time())}-{next(self._ids)}", to, subject, html)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+        self._queue.put(job)
+        return job.to_dict()
+
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    def job(self, job_id: str):
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def _trim(self):
+        # Forget the oldest finished jobs; queued and retrying ones are always kept
+        excess = len(self._jobs) - JOB_HISTORY
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.status in ("sent", "failed")][:excess]:
+            del self._jobs[job_id]
+
+    # -- workers ----------------------------------------------------------
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.pool_size):
+            thread = threading.Thread(target=self._run, name=f"smtp-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def _run(self):
+        session = _Session(self)
+        while not self._stop.is_set():
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=1))
+                # A fair share of the backlog, so every session in the pool gets work
+                limit = min(self.batch_size, -(-(self._queue.qsize() + 1) // self.pool_size))
+                while batch[-1] is not None and len(batch) < limit:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch and batch[-1] is None:
+                batch.pop()
+                self._stop.set()
+            if batch:
+                self._deliver(session, batch)
+        session.close()
+
+    def _message(self, job):
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = job.subject
+        msg["From"] = self.sender
+        msg["To"] = job.to
+        msg.attach(MIMEText(job.html, "html"))
+        return msg
+
+    def _deliver(self, session, batch):
+        for job in batch:
+            job.status = "sending"
+            job.attempts += 1
+            try:
+                session.ensure()
+                try:
+                    session.send(self._message(job))
+                except smtplib.SMTPServerDisconnected:
+                    # The server closed an idle session under us; one fresh connection, same attempt
+                    session.connect()
+                    session.send(self._message(job))
+            except smtplib.SMTPRecipientsRefused as e:
+                self._failed(job, e, permanent=True)
+            except smtplib.SMTPResponseException as e:
+                self._failed(job, e, permanent=500 <= e.smtp_code < 600)
+                if isinstance(e, smtplib.SMTPAuthenticationError):
+                    session.close()
+            except (smtplib.SMTPException, OSError) as e:
+                session.close()
+                self._failed(job, e)
+            else:
+                job.status = "sent"
+                job.error = None
+                job.sent_at = datetime.utcnow().isoformat()
+                self.sent += 1
+
+    def _failed(self, job, error, permanent: bool = False):
+        job.error = str(error)
+        self.last_error = job.error
+        if permanent or job.attempts >= MAX_ATTEMPTS:
+            job.status = "failed"
+            self.failed += 1
+            return
+        job.status = "retrying"
+        self.retries += 1
+        timer = threading.Timer(RETRY_BACKOFF * 2 ** (job.attempts - 1), self._queue.put, (job,))
+        timer.daemon = True
+        timer.start()
+
+    def stats(self) -> dict:
+        statuses = {}
+        for job in list(self._jobs.values()):
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "configured": self.configured,
+            "running": any(t.is_alive() for t in self._threads),
+            "pool_size": self.pool_size,
+            "queue_depth": self.backlog(),
+            "jobs": statuses,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "connections": self.connections,
+            "sessions_reused": self.reused,
+            "last_error": self.last_error,
+        }
+
+
+# Shared mailer: fed by /send-email, started with the app
+mailer = Mailer()
@@ -1,22 +1,33 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from routes.news import router
 from routes.about import router2
 from routes.auth import router_auth
 from scraping import fetcher
-from typing import List, Dict, Any
-import asyncio
+from scraping.scheduler import IngestScheduler
+from scraping import enrich
+from response_cache import article_cache, trending_cache
+from search_index import article_index
+from chat_context import chat_context
+from summary_cache import summary_cache, summary_key
+from summary_worker import summary_worker, BATCH_PROMPT_VERSION
+from database import db
+from auth_utils import token_cache
+from trending import trending_engine
+from llm_client import llm
+from mailer import mailer
+from whatsapp import whatsapp, clean_phone_number
+from digest import digest_engine
+import threading
+from typing import List, Dict, Any, Optional
 
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import requests
 import json
-from datetime import datetime
+import re
 
 load_dotenv()
 # Also try loading from parent directory
@@ -43,25 +54,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.get("/articles")
-def get_all_articles():
-    if fetcher.mongodb_available and fetcher.collection is not None:
-        articles = list(fetcher.collection.find({}, {"_id": 0}))  # exclude MongoDB _id
-        return {"articles": articles}
-    return {"articles": []}
-
 @app.post("/scrape")
 def scrape_and_store(n: int = 20):
     result = fetcher.get_news(n)
     return {
         "message": result.get("message", f"Scraped {result.get('total', 0)} articles"),
         "articles": result.get("articles", []),
-        "total": result.get("total", 0)
+        "total": result.get("total", 0),
+        "feeds": result.get("feeds", {})
+    }
+
+@app.get("/scrape/cache")
+def scrape_cache_stats():
+    """Per-feed conditional-GET hit/miss counters."""
+    return fetcher.feed_cache.stats()
+
+@app.get("/cache/stats")
+def response_cache_stats():
+    """Hit rates of the response caches, the summary and token caches, and the chat context block."""
+    return {
+        "articles": article_cache.stats(),
+        "trending": {**trending_cache.stats(), "engine": trending_engine.stats()},
+        "summaries": summary_cache.stats(),
+        "chat_context": chat_context.stats(),
+        "tokens": token_cache.stats()
     }
 
+@app.get("/llm/stats")
+def llm_stats():
+    """Queue depth, in-flight calls, errors and latency of the shared LLM client."""
+    return llm.stats()
+
 # Request body models
 class ChatRequest(BaseModel):
     query: str
+    category: Optional[str] = None  # only use news from this category as context
+    relevant: bool = False          # prefer articles matching the query over the newest ones
 
 class EmailRequest(BaseModel):
     email: str
@@ -84,10 +112,15 @@ class RelatedRequest(BaseModel):
 
 
 
-@app.post("/summarize")
-async def summarize_article(request: SummarizeRequest):
-    try:
-        prompt = f"""You are a professional news editor. Summarize this news article with more detail than a standard TL;DR.
+# Summarize new articles in the background; needs a model to talk to
+SUMMARY_WORKER_ENABLED = os.getenv("SUMMARY_WORKER", "1") == "1" and bool(os.getenv("GEMINI_API_KEY") or os.getenv("LLM_ENDPOINT"))
+
+# Bump the version whenever SUMMARIZE_PROMPT changes so cached summaries are regenerated
+SUMMARIZE_PROMPT_VERSION = "v1"
+# /summarize serves what the background worker wrote with BATCH_PROMPT, so the shared
+# cache key covers both templates: editing either one invalidates stored summaries
+SUMMARY_KEY_VERSION = f"{SUMMARIZE_PROMPT_VERSION}+batch{BATCH_PROMPT_VERSION}"
+SUMMARIZE_PROMPT = """You are a professional news editor. Summarize this news article with more detail than a standard TL;DR.
         
         Provide:
         1. A comprehensive summary paragraph (3-5 sentences) explaining the key events, context, and significance.
@@ -95,22 +128,44 @@ async def summarize_article(request: SummarizeRequest):
         
         Keep the tone informative and objective. Use plain text but keep the bullet point structure.
         
-        Title: {request.title}
-        Content: {request.summary}
+        Title: {title}
+        Content: {summary}
         
         DETAILED SUMMARY:"""
-        
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        # Clean up unwanted markdown but preserve lines and bullets
-        text = response.text.strip()
-        text = text.replace('**', '').replace('__', '').replace('###', '').replace('##', '').replace('#', '').replace('`', '')
-        
+
+
+def clean_summary_text(text: str) -> str:
+    # Clean up unwanted markdown but preserve lines and bullets
+    text = text.strip()
+    text = text.replace('**', '').replace('__', '').replace('###', '').replace('##', '').replace('#', '').replace('`', '')
+    return text
+
+
+async def generate_summary(title: str, summary: str) -> str:
+    prompt = SUMMARIZE_PROMPT.format(title=title, summary=summary)
+    return clean_summary_text(await llm.generate(prompt, endpoint="summarize"))
+
+
+@app.post("/summarize")
+async def summarize_article(request: SummarizeRequest):
+    try:
+        # Cached by (prompt version, title, summary); concurrent identical requests share one LLM call
+        key = summary_key(SUMMARY_KEY_VERSION, request.title, request.summary)
+        text = await summary_cache.get_or_create(
+            key, request.title, request.summary,
+            lambda: generate_summary(request.title, request.summary)
+        )
         return {"tldr": text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Summarization failed: {str(e)}")
 
 
+@app.get("/summarize/status")
+def summarize_status():
+    """Backlog, progress and token budget of the background summarizer."""
+    return summary_worker.stats()
+
+
 @app.post("/related")
 async def get_related_articles(request: RelatedRequest):
     try:
@@ -122,64 +177,26 @@ Category: {request.category}
 Summary: {request.summary}
 
 Keywords:"""
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        keywords = [k.strip().lower() for k in response.text.strip().split(',') if k.strip()]
+        text = await llm.generate(prompt, endpoint="related")
+        keywords = [k.strip().lower() for k in text.strip().split(',') if k.strip()]
         
-        # Search MongoDB for articles matching those keywords
-        if fetcher.mongodb_available and fetcher.collection is not None and keywords:
-            regex_pattern = '|'.join(keywords[:5])
-            related = list(fetcher.collection.find(
-                {
-                    "$and": [
-                        {"title": {"$regex": regex_pattern, "$options": "i"}},
-                        {"title": {"$ne": request.title}}
-                    ]
-                },
-                {"_id": 0}
-            ).limit(6))
-            
-            # If regex approach found too few, try individual keyword searches
-            if len(related) < 3:
-                for kw in keywords:
-                    extra = list(fetcher.collection.find(
-                        {
-                            "$or": [
-                                {"title": {"$regex": kw, "$options": "i"}},
-                                {"summary": {"$regex": kw, "$options": "i"}}
-                            ],
-                            "title": {"$ne": request.title}
-                        },
-                        {"_id": 0}
-                    ).limit(3))
-                    for e in extra:
-                        if not any(r['title'] == e['title'] for r in related):
-                            related.append(e)
-                    if len(related) >= 6:
-                        break
-            
-            return {"related": related[:6], "keywords": keywords}
+        # Ranked top-k lookup in the in-memory BM25 index (no collection scan)
+        related = article_index.search(keywords[:5], k=6, exclude_title=request.title) if keywords else []
         
-        return {"related": [], "keywords": keywords}
+        # Too few hits on the keywords alone: let the article's own title widen the query
+        if len(related) < 3:
+            related = article_index.search(keywords[:5] + [request.title], k=6, exclude_title=request.title)
+        
+        return {"related": related, "keywords": keywords}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Related articles failed: {str(e)}")
 
-@app.post("/chat")
-async def chat(request: ChatRequest):
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        
-        # Fetch latest articles for context
-        news_context = ""
-        if fetcher.mongodb_available and fetcher.collection is not None:
-            articles = list(fetcher.collection.find({}, {"_id": 0, "title": 1, "source": 1, "category": 1, "summary": 1}).sort("fetched_at", -1).limit(40))
-            if articles:
-                news_context = "\nRECENT NEWS CONTEXT:\n"
-                for i, a in enumerate(articles, 1):
-                    news_context += f"{i}. [{a.get('category', 'Other')}] {a.get('title')} ({a.get('source')})\n"
-
-        # Enhanced prompt for detailed, well-formatted responses
-        enhanced_prompt = f"""
+def build_chat_prompt(request: ChatRequest) -> str:
+    # Precomputed context block, refreshed by ingest rather than per request
+    news_context = chat_context.block(request.query, request.category, request.relevant)
+
+    # Enhanced prompt for detailed, well-formatted responses
+    return f"""
         You are the Taaza Khabar News Assistant. Your goal is to provide helpful, detailed, and accurate information about news and current events.
         
         {news_context}
@@ -196,9 +213,13 @@ async def chat(request: ChatRequest):
         
         User Query: {request.query}
         """
-        
-        response = model.generate_content(enhanced_prompt)
-        raw_text = response.text.strip()
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    try:
+        enhanced_prompt = build_chat_prompt(request)
+        raw_text = (await llm.generate(enhanced_prompt, endpoint="chat")).strip()
         
         # Structure the response
         formatted_response = {
@@ -212,64 +233,130 @@ async def chat(request: ChatRequest):
         print(f"Chat error: {e}")
         return {"error": str(e)}
 
-def parse_response_sections(text):
-    """Parse markdown-style text into structured sections for the frontend"""
-    sections = []
-    lines = text.split('\n')
-    current_section = {"type": "paragraph", "content": []}
-    
-    import re # Moved import re here
-    
-    for line in lines:
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """/chat as Server-Sent Events.
+
+    Emits "token" events with each chunk of model text as it arrives,
+    "section" events as soon as a header, list or paragraph is complete,
+    and a final "done" event carrying the same payload /chat returns.
+    """
+    async def events():
+        parser = SectionParser()
+        chunks = []
+        try:
+            enhanced_prompt = build_chat_prompt(request)
+            async for chunk in llm.stream(enhanced_prompt, endpoint="chat"):
+                if not chunks:
+                    # /chat strips the answer; drop leading whitespace the same way
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                chunks.append(chunk)
+                yield sse_event("token", {"text": chunk})
+                for section in parser.feed(chunk):
+                    yield sse_event("section", section)
+            for section in parser.close():
+                yield sse_event("section", section)
+            raw_text = "".join(chunks).strip()
+            yield sse_event("done", {
+                "text": raw_text,
+                "formatted": True,
+                "sections": parse_response_sections(raw_text)
+            })
+        except Exception as e:
+            print(f"Chat stream error: {e}")
+            yield sse_event("error", {"error": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+class SectionParser:
+    """Incremental version of parse_response_sections.
+
+    Feed it text chunks as they stream in; feed() returns the sections that
+    became complete with that chunk (a header as soon as its line ends, a
+    list or paragraph once the next line shows it is over) and close()
+    returns whatever is left. Feeding the whole text at once gives exactly
+    the same sections as parse_response_sections.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._current = {"type": "paragraph", "content": []}
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split('\n')
+        sections = []
+        for line in lines:
+            self._line(line, sections)
+        return sections
+
+    def close(self):
+        sections = []
+        self._line(self._buffer, sections)
+        self._buffer = ""
+        if self._current["content"]:
+            sections.append(self._current)
+            self._current = {"type": "paragraph", "content": []}
+        return sections
+
+    def _line(self, line, sections):
+        current = self._current
         stripped_line = line.strip()
-        
+
         if not stripped_line:
-            if current_section["content"]:
-                sections.append(current_section)
-                current_section = {"type": "paragraph", "content": []}
-            continue
-            
+            if current["content"]:
+                sections.append(current)
+                self._current = {"type": "paragraph", "content": []}
+            return
+
         # Headers
-        if stripped_line.startswith('### '):
-            if current_section["content"]: sections.append(current_section)
-            sections.append({"type": "header", "level": 3, "content": [stripped_line[4:]]})
-            current_section = {"type": "paragraph", "content": []}
-            continue
-        if stripped_line.startswith('## '):
-            if current_section["content"]: sections.append(current_section)
-            sections.append({"type": "header", "level": 2, "content": [stripped_line[3:]]})
-            current_section = {"type": "paragraph", "content": []}
-            continue
-            
+        for prefix, level in (('### ', 3), ('## ', 2)):
+            if stripped_line.startswith(prefix):
+                if current["content"]: sections.append(current)
+                sections.append({"type": "header", "level": level, "content": [stripped_line[len(prefix):]]})
+                self._current = {"type": "paragraph", "content": []}
+                return
+
         # Lists
         if stripped_line.startswith(('- ', '• ', '* ')):
-            if current_section["type"] != "bullet_list":
-                if current_section["content"]: sections.append(current_section)
-                current_section = {"type": "bullet_list", "content": []}
-            current_section["content"].append(stripped_line[2:])
-            continue
-            
+            if current["type"] != "bullet_list":
+                if current["content"]: sections.append(current)
+                current = self._current = {"type": "bullet_list", "content": []}
+            current["content"].append(stripped_line[2:])
+            return
+
         if re.match(r'^\d+\.\s', stripped_line):
-            if current_section["type"] != "numbered_list":
-                if current_section["content"]: sections.append(current_section)
-                current_section = {"type": "numbered_list", "content": []}
-            current_section["content"].append(re.sub(r'^\d+\.\s', '', stripped_line))
-            continue
-            
+            if current["type"] != "numbered_list":
+                if current["content"]: sections.append(current)
+                current = self._current = {"type": "numbered_list", "content": []}
+            current["content"].append(re.sub(r'^\d+\.\s', '', stripped_line))
+            return
+
         # Default to paragraph
-        if current_section["type"] != "paragraph":
-            sections.append(current_section)
-            current_section = {"type": "paragraph", "content": []}
-        current_section["content"].append(line) # Keep original line for sub-formatting later
-        
-    if current_section["content"]:
-        sections.append(current_section)
-        
-    return sections
+        if current["type"] != "paragraph":
+            sections.append(current)
+            current = self._current = {"type": "paragraph", "content": []}
+        current["content"].append(line) # Keep original line for sub-formatting later
 
-def format_articles_for_email(articles):
-    """Format articles for email content"""
-    email_content = """
+
+def parse_response_sections(text):
+    """Parse markdown-style text into structured sections for the frontend"""
+    parser = SectionParser()
+    return parser.feed(text) + parser.close()
+
+EMAIL_HEAD = """
     <html>
     <head>
         <style>
@@ -289,9 +376,18 @@ def format_articles_for_email(articles):
             <p>Here are your selected news articles</p>
         </div>
     """
-    
-    for article in articles:
-        email_content += f"""
+
+EMAIL_FOOT = """
+        <div class="footer">
+            <p>Powered by Taaza Khabar - Intelligent News Without Overload</p>
+            <p>This email was sent because you requested news updates through our platform.</p>
+        </div>
+    </body>
+    </html>
+    """
+
+def format_article_for_email(article):
+    return f"""
         <div class="article">
             <span class="source">{article.get('source', 'Unknown')}</span>
             <h2 class="title">{article.get('title', 'No Title')}</h2>
@@ -300,17 +396,11 @@ def format_articles_for_email(articles):
             <p><a href="{article.get('link', '#')}" class="link" target="_blank">Read Full Article →</a></p>
         </div>
         """
-    
-    email_content += """
-        <div class="footer">
-            <p>Powered by Taaza Khabar - Intelligent News Without Overload</p>
-            <p>This email was sent because you requested news updates through our platform.</p>
-        </div>
-    </body>
-    </html>
-    """
-    
-    return email_content
+
+def format_articles_for_email(articles):
+    """Format articles for email content"""
+    # One join instead of re-copying the growing document for every article
+    return "".join([EMAIL_HEAD, *map(format_article_for_email, articles), EMAIL_FOOT])
 
 def format_articles_for_whatsapp(articles):
     """Format articles for WhatsApp message"""
@@ -330,129 +420,65 @@ def format_articles_for_whatsapp(articles):
     
     return message
 
-@app.post("/send-email")
+@app.post("/send-email", status_code=202)
 async def send_email(request: EmailRequest):
-    try:
-        # Email configuration from environment variables
-        smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-        smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        sender_email = os.getenv("SENDER_EMAIL")
-        sender_password = os.getenv("SENDER_PASSWORD")
-        
-        print(f"Debug - SENDER_EMAIL: {sender_email}")
-        print(f"Debug - SENDER_PASSWORD exists: {bool(sender_password)}")
-        print(f"Debug - SMTP_SERVER: {smtp_server}")
-        print(f"Debug - SMTP_PORT: {smtp_port}")
-        
-        if not sender_email or not sender_password:
-            raise HTTPException(
-                status_code=500, 
-                detail=f"Email configuration not found. SENDER_EMAIL: {bool(sender_email)}, SENDER_PASSWORD: {bool(sender_password)}"
-            )
-        
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"📰 News Update from Taaza Khabar - {len(request.articles)} Articles"
-        msg['From'] = sender_email
-        msg['To'] = request.email
-        
-        # Create HTML content
-        html_content = format_articles_for_email(request.articles)
-        html_part = MIMEText(html_content, 'html')
-        msg.attach(html_part)
-        
-        # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-        
-        return {
-            "success": True,
-            "message": f"Successfully sent {len(request.articles)} articles to {request.email}"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send email: {str(e)}")
+    if not mailer.configured:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Email configuration not found. SENDER_EMAIL: {bool(mailer.sender)}, SENDER_PASSWORD: {bool(mailer.password)}"
+        )
+    
+    # Queued for the SMTP pool; poll /send-email/{job_id} for delivery
+    job = mailer.submit(
+        request.email,
+        f"📰 News Update from Taaza Khabar - {len(request.articles)} Articles",
+        format_articles_for_email(request.articles)
+    )
+    return {
+        "success": True,
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "message": f"Queued {len(request.articles)} articles for {request.email}"
+    }
+
+@app.get("/send-email/{job_id}")
+def email_job_status(job_id: str):
+    job = mailer.job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Email job not found")
+    return job
+
+@app.get("/email/stats")
+def email_stats():
+    """SMTP pool: queue depth, job statuses, retries and connection reuse."""
+    return mailer.stats()
 
-@app.post("/send-whatsapp")
+@app.post("/send-whatsapp", status_code=202)
 async def send_whatsapp(request: WhatsAppRequest):
-    try:
-        # WhatsApp API configuration from environment variables
-        whatsapp_token = os.getenv("WHATSAPP_TOKEN")
-        whatsapp_phone_id = os.getenv("WHATSAPP_PHONE_ID")
-        
-        # For testing purposes, if WhatsApp credentials are not configured,
-        # we'll simulate the sending and save to a file instead
-        if not whatsapp_token or not whatsapp_phone_id or whatsapp_token == "your_whatsapp_business_api_token":
-            # Format message
-            message_text = format_articles_for_whatsapp(request.articles)
-            
-            # Save to file for testing
-            timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-            filename = f"whatsapp_message_{timestamp}.txt"
-            
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(f"WhatsApp Message for: {request.whatsapp}\n")
-                    f.write(f"Timestamp: {datetime.now()}\n")
-                    f.write("="*50 + "\n\n")
-                    f.write(message_text)
-                
-                return {
-                    "success": True,
-                    "message": f"WhatsApp simulation: Message saved to {filename}. {len(request.articles)} articles prepared for {request.whatsapp}",
-                    "simulation": True
-                }
-            except Exception as e:
-                print(f"Error saving WhatsApp simulation: {e}")
-                return {
-                    "success": True,
-                    "message": f"WhatsApp simulation successful: {len(request.articles)} articles prepared for {request.whatsapp}",
-                    "simulation": True
-                }
-        
-        # Real WhatsApp API implementation
-        # Format message
-        message_text = format_articles_for_whatsapp(request.articles)
-        
-        # WhatsApp Business API endpoint
-        url = f"https://graph.facebook.com/v17.0/{whatsapp_phone_id}/messages"
-        
-        headers = {
-            "Authorization": f"Bearer {whatsapp_token}",
-            "Content-Type": "application/json"
-        }
-        
-        # Clean phone number (remove non-digits except +)
-        phone_number = ''.join(c for c in request.whatsapp if c.isdigit() or c == '+')
-        if not phone_number.startswith('+'):
-            phone_number = '+' + phone_number
-        
-        payload = {
-            "messaging_product": "whatsapp",
-            "to": phone_number,
-            "type": "text",
-            "text": {
-                "body": message_text
-            }
-        }
-        
-        response = requests.post(url, headers=headers, json=payload)
-        
-        if response.status_code == 200:
-            return {
-                "success": True,
-                "message": f"Successfully sent {len(request.articles)} articles to {request.whatsapp}"
-            }
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"WhatsApp API error: {response.text}"
-            )
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send WhatsApp message: {str(e)}")
+    # Queued for the rate-limited dispatcher; without credentials it appends to the simulation log
+    job = whatsapp.submit(clean_phone_number(request.whatsapp), format_articles_for_whatsapp(request.articles))
+    message = f"Queued {len(request.articles)} articles for {request.whatsapp}"
+    if whatsapp.simulation:
+        message = f"WhatsApp simulation: {message}, logged to {whatsapp.sink.path}"
+    return {
+        "success": True,
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "message": message,
+        "simulation": whatsapp.simulation
+    }
+
+@app.get("/send-whatsapp/{job_id}")
+def whatsapp_job_status(job_id: str):
+    job = whatsapp.job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="WhatsApp job not found")
+    return job
+
+@app.get("/whatsapp/stats")
+def whatsapp_stats():
+    """Dispatcher: sink, queue depth, job statuses, retries, 429s and token-bucket waits."""
+    return whatsapp.stats()
 
 
 # Include other routers
@@ -466,21 +492,87 @@ if __name__ == "__main__":
     uvicorn.run("main:app",host="127.0.0.1", port=8000, reload=True)
 
 
-# Scheduled scraping background task
-async def scheduled_scraper():
-    """Background task that scrapes news every 60 minutes."""
-    await asyncio.sleep(10)  # Wait 10s after startup
-    while True:
-        try:
-            print("\n⏰ [Scheduled Scrape] Starting automatic news scrape...")
-            result = fetcher.get_news(20)
-            print(f"⏰ [Scheduled Scrape] Done — fetched {result.get('total', 0)} articles")
-        except Exception as e:
-            print(f"⏰ [Scheduled Scrape] Error: {e}")
-        await asyncio.sleep(3600)  # Wait 60 minutes
+# Scheduled scraping runs on worker threads so it never blocks the event loop
+ingest_scheduler = IngestScheduler(fetcher.get_news, list(fetcher.RSS_FEEDS))
+
+
+@app.get("/scrape/status")
+def scrape_status():
+    """Next run, last run duration, queue depth and per-feed polling intervals."""
+    return ingest_scheduler.status()
+
+
+def backfill_enrichment():
+    collection = db.collection("articles")
+    try:
+        updated = enrich.backfill(collection)
+        updated += fetcher.backfill_published(collection)
+        if updated:
+            print(f"✅ Backfilled {updated} existing articles")
+            article_cache.bump()
+        loaded = article_index.load(collection)
+        print(f"✅ Search index built over {loaded} articles")
+        chat_context.load(collection)
+        queued = summary_worker.load_backlog(collection)
+        if queued:
+            print(f"📝 Queued {queued} articles for background summaries")
+    except Exception as e:
+        print(f"⚠️ Article backfill failed: {e}")
+
+
+def on_db_connect():
+    # Runs on the first connect and again after every outage, so in-memory state catches up
+    summary_cache.attach(db.collection("articles"), on_store=article_cache.bump)
+    # Responses built during the outage (or before it) may be stale now
+    article_cache.bump()
+    trending_cache.bump()
+    threading.Thread(target=backfill_enrichment, daemon=True).start()
+
+
+@app.get("/digest/status")
+def digest_status():
+    """Next scheduled digest run and the last run's report (users, sent, users/sec)."""
+    return digest_engine.stats()
+
+
+@app.post("/digest/run", status_code=202)
+def run_digest():
+    """Start a digest fan-out now for subscribers not yet served today."""
+    if not db.available:
+        raise HTTPException(status_code=500, detail="Database not available")
+    if digest_engine.running:
+        raise HTTPException(status_code=409, detail="A digest run is already in progress")
+    if len(digest_engine.unconfigured_channels()) == len(digest_engine.channels):
+        raise HTTPException(status_code=500, detail="No delivery channel configured (SMTP or WhatsApp credentials)")
+    threading.Thread(target=digest_engine.run, name="digest-run", daemon=True).start()
+    return {"success": True, "message": "Digest run started; see /digest/status"}
+
+
+@app.get("/db/status")
+def db_status():
+    return db.stats()
 
 
 @app.on_event("startup")
 async def startup_event():
-    asyncio.create_task(scheduled_scraper())
-    print("⏰ Scheduled scraping enabled — every 60 minutes")
+    if SUMMARY_WORKER_ENABLED:
+        summary_worker.start(SUMMARY_KEY_VERSION, clean_summary_text)
+    db.on_connect(on_db_connect)
+    db.start()
+    trending_engine.start()
+    mailer.start()
+    whatsapp.start()
+    digest_engine.start(format_articles_for_email, format_articles_for_whatsapp)
+    ingest_scheduler.start()
+    print("⏰ Scheduled scraping enabled — adaptive per-feed intervals")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    ingest_scheduler.stop()
+    digest_engine.stop()
+    await summary_worker.stop()
+    trending_engine.stop()
+    mailer.stop()
+    await whatsapp.stop()
+    db.stop()
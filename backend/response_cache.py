@@ -0,0 +1,92 @@
+import hashlib
+import json
+import secrets
+import threading
+from collections import OrderedDict
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+class ResponseCache:
+    """Versioned cache of serialized JSON responses.
+
+    Every entry is tagged with the version that was current when it was
+    built; bump() invalidates all of them at once. The version also feeds
+    the ETag, so clients holding the latest body get a 304. Versions
+    restart with the process, so ETags also carry a per-boot nonce: a tag
+    from before a restart, or from another worker, never matches. Error
+    bodies are sent without an ETag and never cached.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256):
+        self.name = name
+        self.max_entries = max_entries
+        self.version = 1
+        self.boot = secrets.token_hex(4)
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bump(self):
+        """Call whenever the underlying data changes."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def etag(self, key: str, version: int = None) -> str:
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()[:12]
+        return f'W/"{self.name}-{self.boot}-{version or self.version}-{digest}"'
+
+    def respond(self, request: Request, key: str, build) -> Response:
+        """Serve key from cache, building it with build() on a miss."""
+        with self._lock:
+            version = self.version
+        etag = self.etag(key, version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if body is None:
+            data = build()
+            body = json.dumps(jsonable_encoder(data), ensure_ascii=False).encode("utf-8")
+            with self._lock:
+                self.misses += 1
+            if isinstance(data, dict) and data.get("error"):
+                # Not revalidatable: once the error clears the client must get the real body
+                return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+            with self._lock:
+                # Don't store bodies built from data that changed mid-build
+                if version == self.version:
+                    self._entries[key] = body
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Bumped by ingest whenever bulk_write changes the articles collection
+article_cache = ResponseCache("articles")
+# Bumped by /auth/read whenever reading history changes
+trending_cache = ResponseCache("trending")
@@ -1,39 +1,120 @@
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Request
 from pydantic import BaseModel
-from auth_utils import hash_password, verify_password, create_access_token, decode_token
-from pymongo import MongoClient
-from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
-import os
-from dotenv import load_dotenv
+from auth_utils import (
+    hash_password_async, verify_password_async, needs_rehash, create_access_token, decode_token
+)
 from datetime import datetime
-
-load_dotenv()
-load_dotenv("../.env")
+from pymongo import UpdateOne, DeleteMany
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import List, Optional
+import threading
+from response_cache import trending_cache
+from trending import trending_engine, WINDOWS, DEFAULT_WINDOW
+from database import db
+from whatsapp import clean_phone_number
 
 router_auth = APIRouter(prefix="/auth", tags=["Authentication"])
 
-# MongoDB connection
-_db_available = False
-users_collection = None
-bookmarks_collection = None
-history_collection = None
-
-try:
-    mongodb_uri = os.getenv("MONGODB_URI")
-    if not mongodb_uri:
-        raise ConnectionFailure("MONGODB_URI not set")
-    client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=5000)
-    client.admin.command('ping')
-    db = client["news"]
-    users_collection = db["users"]
-    bookmarks_collection = db["bookmarks"]
-    history_collection = db["reading_history"]
+# Collections on the shared client; availability is tracked by db
+users_collection = db.collection("users")
+bookmarks_collection = db.collection("bookmarks")
+history_collection = db.collection("reading_history")
+
+MAX_PAGE_SIZE = 200
+
+
+def _ensure_unique_per_user(collection):
+    """Unique (user_email, article_title), removing duplicates the old find-then-insert let through."""
+    name = "user_email_1_article_title_1"
+    existing = collection.index_information().get(name)
+    if existing and existing.get("unique"):
+        return
+    duplicates = list(collection.aggregate([
+        {"$group": {"_id": {"user": "$user_email", "title": "$article_title"},
+                    "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True))
+    if duplicates:
+        collection.delete_many({"_id": {"$in": [i for d in duplicates for i in d["ids"][1:]]}})
+        # Their materialized counts included the duplicates; recompute on next profile view
+        users_collection.update_many({"email": {"$in": [d["_id"]["user"] for d in duplicates]}},
+                                     {"$unset": {"stats": ""}})
+        print(f"✅ Removed duplicates for {len(duplicates)} entries in {collection.name}")
+    if existing:
+        collection.drop_index(name)
+    collection.create_index([("user_email", 1), ("article_title", 1)], unique=True)
+
+
+@db.on_connect
+def ensure_indexes():
     users_collection.create_index("email", unique=True)
-    history_collection.create_index([("user_email", 1), ("article_title", 1)])
-    _db_available = True
-    print("✅ Auth: MongoDB connected")
-except Exception as e:
-    print(f"⚠️ Auth: MongoDB not available - {e}")
+    # Digest fan-out streams subscribers that weren't served today
+    users_collection.create_index([("preferences.digest.enabled", 1), ("preferences.digest.last_sent_at", 1)])
+    _ensure_unique_per_user(bookmarks_collection)
+    _ensure_unique_per_user(history_collection)
+    # Keyset pagination: a user's newest entries first
+    bookmarks_collection.create_index([("user_email", 1), ("bookmarked_at", -1), ("_id", -1)])
+    history_collection.create_index([("user_email", 1), ("read_at", -1), ("_id", -1)])
+    history_collection.create_index("read_at")
+
+
+@db.on_connect
+def start_stats_backfill():
+    threading.Thread(target=backfill_reading_stats, daemon=True).start()
+    threading.Thread(target=trending_engine.load, args=(history_collection,), daemon=True).start()
+
+
+# Per-user reading stats, kept on the user document:
+#   stats: {total_reads, categories: {category: reads}, bookmarks}
+# and updated with $inc as reads and bookmarks change.
+
+def _stat_key(category):
+    # Category names become field names under stats.categories
+    return (category or "Other").replace(".", "_").replace("$", "_")
+
+
+def _inc_stats(email, inc):
+    # Users without materialized stats are left alone; their first profile view computes them
+    users_collection.update_one({"email": email, "stats": {"$exists": True}}, {"$inc": inc})
+
+
+def compute_reading_stats(email):
+    categories = {}
+    for row in history_collection.aggregate([
+        {"$match": {"user_email": email}},
+        {"$group": {"_id": "$article_category", "count": {"$sum": 1}}}
+    ]):
+        key = _stat_key(row["_id"])
+        categories[key] = categories.get(key, 0) + row["count"]
+    return {
+        "total_reads": sum(categories.values()),
+        "categories": categories,
+        "bookmarks": bookmarks_collection.count_documents({"user_email": email})
+    }
+
+
+def backfill_reading_stats(batch_size: int = 500) -> int:
+    """Materialize stats for existing users that don't have them yet."""
+    updated = 0
+    try:
+        operations = []
+        for user in users_collection.find({"stats": {"$exists": False}}, {"_id": 0, "email": 1}):
+            operations.append(UpdateOne(
+                {"email": user["email"], "stats": {"$exists": False}},
+                {"$set": {"stats": compute_reading_stats(user["email"])}}
+            ))
+            if len(operations) >= batch_size:
+                updated += users_collection.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            updated += users_collection.bulk_write(operations, ordered=False).modified_count
+        if updated:
+            print(f"✅ Backfilled reading stats for {updated} users")
+    except Exception as e:
+        print(f"⚠️ Reading stats backfill failed: {e}")
+    return updated
 
 
 # Models
@@ -53,6 +134,22 @@ class BookmarkRequest(BaseModel):
     article_link: str
     article_published: str
 
+class BookmarkBulkRequest(BaseModel):
+    add: List[BookmarkRequest] = []
+    remove: List[str] = []
+
+class BookmarkSyncRequest(BaseModel):
+    bookmarks: List[BookmarkRequest]
+
+class DigestPreferences(BaseModel):
+    enabled: bool = False
+    channel: str = "email"            # "email" or "whatsapp"
+    whatsapp: Optional[str] = None
+
+class PreferencesRequest(BaseModel):
+    categories: Optional[List[str]] = None
+    digest: Optional[DigestPreferences] = None
+
 class ReadRequest(BaseModel):
     article_title: str
     article_source: str
@@ -60,7 +157,8 @@ class ReadRequest(BaseModel):
 
 
 # Auth dependency
-def get_current_user(authorization: str = Header(None)):
+async def get_current_user(authorization: str = Header(None)):
+    """Payload of the request's bearer token; verified tokens are served from token_cache."""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
     token = authorization.split(" ")[1]
@@ -71,7 +169,7 @@ def get_current_user(authorization: str = Header(None)):
 
 
 def _check_db():
-    if not _db_available:
+    if not db.available:
         raise HTTPException(status_code=500, detail="Database not available")
 
 
@@ -83,18 +181,19 @@ async def signup(request: SignupRequest):
     if len(request.password) < 6:
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters")
     
-    existing = users_collection.find_one({"email": request.email.lower()})
+    existing = await db.run(users_collection.find_one, {"email": request.email.lower()})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     user = {
         "name": request.name.strip(),
         "email": request.email.lower().strip(),
-        "password": hash_password(request.password),
+        "password": await hash_password_async(request.password),
         "created_at": datetime.utcnow().isoformat(),
-        "preferences": {"categories": [], "theme": "dark"}
+        "preferences": {"categories": [], "theme": "dark"},
+        "stats": {"total_reads": 0, "categories": {}, "bookmarks": 0}
     }
-    users_collection.insert_one(user)
+    await db.run(users_collection.insert_one, user)
     
     token = create_access_token({"email": user["email"], "name": user["name"]})
     return {
@@ -104,13 +203,21 @@ async def signup(request: SignupRequest):
     }
 
 
+async def _rehash_password(email: str, password: str):
+    # Upgrade a hash made with an old cost factor; runs after the response is sent
+    hashed = await hash_password_async(password)
+    await db.run(users_collection.update_one, {"email": email}, {"$set": {"password": hashed}})
+
+
 @router_auth.post("/login")
-async def login(request: LoginRequest):
+async def login(request: LoginRequest, background_tasks: BackgroundTasks):
     _check_db()
     
-    user = users_collection.find_one({"email": request.email.lower().strip()})
-    if not user or not verify_password(request.password, user["password"]):
+    user = await db.run(users_collection.find_one, {"email": request.email.lower().strip()})
+    if not user or not await verify_password_async(request.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    if needs_rehash(user["password"]):
+        background_tasks.add_task(_rehash_password, user["email"], request.password)
     
     token = create_access_token({"email": user["email"], "name": user["name"]})
     return {
@@ -121,77 +228,158 @@ async def login(request: LoginRequest):
 
 
 @router_auth.get("/me")
-async def get_me_route(authorization: str = Header(None)):
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    token = authorization.split(" ")[1]
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    return {"user": {"name": payload["name"], "email": payload["email"]}}
+async def get_me_route(user: dict = Depends(get_current_user)):
+    return {"user": {"name": user["name"], "email": user["email"]}}
 
 
 # Bookmark Routes
+def _decode_cursor(before: str):
+    """'<timestamp>_<ObjectId>' as returned in next_before."""
+    ts, _, object_id = before.rpartition("_")
+    try:
+        return ts, ObjectId(object_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid 'before' cursor")
+
+
+def _page(collection, email: str, time_field: str, limit: int, cursor):
+    """One page of a user's entries, newest first, via the (user_email, time, _id) index."""
+    query = {"user_email": email}
+    if cursor:
+        ts, object_id = cursor
+        query["$or"] = [{time_field: {"$lt": ts}}, {time_field: ts, "_id": {"$lt": object_id}}]
+    docs = list(collection.find(query, {"user_email": 0})
+                .sort([(time_field, -1), ("_id", -1)]).limit(limit + 1))
+    next_before = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_before = f"{docs[-1].get(time_field)}_{docs[-1]['_id']}"
+    for doc in docs:
+        doc.pop("_id")
+    return docs, next_before
+
+
+def _bookmark_upsert(email: str, bookmark: BookmarkRequest, now: str):
+    """(filter, update) for an insert-only upsert on the unique (user_email, article_title) index."""
+    return (
+        {"user_email": email, "article_title": bookmark.article_title},
+        {"$setOnInsert": {
+            "user_email": email,
+            "article_title": bookmark.article_title,
+            "article_source": bookmark.article_source,
+            "article_summary": bookmark.article_summary,
+            "article_link": bookmark.article_link,
+            "article_published": bookmark.article_published,
+            "bookmarked_at": now
+        }}
+    )
+
+
+def _write_bookmarks(email: str, operations):
+    """Run bookmark upserts/deletes; returns (added, removed) and keeps the stats in step."""
+    if not operations:
+        return 0, 0
+    try:
+        result = bookmarks_collection.bulk_write(operations, ordered=False)
+        added, removed = result.upserted_count, result.deleted_count
+    except BulkWriteError as e:
+        # A concurrent add of the same title won the race; count what did apply
+        added, removed = e.details.get("nUpserted", 0), e.details.get("nRemoved", 0)
+    if added != removed:
+        _inc_stats(email, {"stats.bookmarks": added - removed})
+    return added, removed
+
+
 @router_auth.post("/bookmarks")
-async def add_bookmark(bookmark: BookmarkRequest, authorization: str = Header(None)):
-    user = get_current_user(authorization)
+async def add_bookmark(bookmark: BookmarkRequest, user: dict = Depends(get_current_user)):
     _check_db()
     
-    existing = bookmarks_collection.find_one({
-        "user_email": user["email"],
-        "article_title": bookmark.article_title
-    })
-    if existing:
+    query, update = _bookmark_upsert(user["email"], bookmark, datetime.utcnow().isoformat())
+    try:
+        # Atomic: the unique index turns a concurrent double-add into a no-op, not a duplicate
+        result = await db.run(bookmarks_collection.update_one, query, update, upsert=True)
+    except DuplicateKeyError:
+        result = None
+    if result is None or result.upserted_id is None:
         raise HTTPException(status_code=400, detail="Already bookmarked")
-    
-    bookmark_data = {
-        "user_email": user["email"],
-        "article_title": bookmark.article_title,
-        "article_source": bookmark.article_source,
-        "article_summary": bookmark.article_summary,
-        "article_link": bookmark.article_link,
-        "article_published": bookmark.article_published,
-        "bookmarked_at": datetime.utcnow().isoformat()
-    }
-    bookmarks_collection.insert_one(bookmark_data)
+    await db.run(_inc_stats, user["email"], {"stats.bookmarks": 1})
     return {"success": True, "message": "Article bookmarked"}
 
 
 @router_auth.delete("/bookmarks")
-async def remove_bookmark(article_title: str, authorization: str = Header(None)):
-    user = get_current_user(authorization)
+async def remove_bookmark(article_title: str, user: dict = Depends(get_current_user)):
     _check_db()
     
-    result = bookmarks_collection.delete_one({
+    result = await db.run(bookmarks_collection.delete_one, {
         "user_email": user["email"],
         "article_title": article_title
     })
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Bookmark not found")
+    await db.run(_inc_stats, user["email"], {"stats.bookmarks": -1})
     return {"success": True, "message": "Bookmark removed"}
 
 
 @router_auth.get("/bookmarks")
-async def get_bookmarks(authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    if not _db_available:
-        return {"bookmarks": []}
+async def get_bookmarks(limit: int = 50, before: str = None, user: dict = Depends(get_current_user)):
+    if not db.available:
+        return {"bookmarks": [], "next_before": None}
     
-    bookmarks = list(bookmarks_collection.find(
-        {"user_email": user["email"]},
-        {"_id": 0, "user_email": 0}
-    ))
-    return {"bookmarks": bookmarks}
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cursor = _decode_cursor(before) if before else None
+    bookmarks, next_before = await db.run(_page, bookmarks_collection, user["email"], "bookmarked_at", limit, cursor)
+    return {"bookmarks": bookmarks, "next_before": next_before}
+
+
+@router_auth.get("/bookmarks/titles")
+async def get_bookmark_titles(user: dict = Depends(get_current_user)):
+    """Every bookmarked title, answered from the (user_email, article_title) index alone."""
+    if not db.available:
+        return {"titles": []}
+    
+    docs = await db.run(lambda: list(bookmarks_collection.find(
+        {"user_email": user["email"]}, {"_id": 0, "article_title": 1}
+    )))
+    return {"titles": [d["article_title"] for d in docs]}
+
+
+@router_auth.post("/bookmarks/bulk")
+async def bulk_bookmarks(request: BookmarkBulkRequest, user: dict = Depends(get_current_user)):
+    """Add and remove many bookmarks in one round trip; a title in both lists is removed."""
+    _check_db()
+    
+    now = datetime.utcnow().isoformat()
+    removing = set(request.remove)
+    operations = [UpdateOne(*_bookmark_upsert(user["email"], b, now), upsert=True) for b in request.add if b.article_title not in removing]
+    if removing:
+        operations.append(DeleteMany({"user_email": user["email"], "article_title": {"$in": list(removing)}}))
+    added, removed = await db.run(_write_bookmarks, user["email"], operations)
+    return {"success": True, "added": added, "removed": removed}
+
+
+@router_auth.put("/bookmarks/sync")
+async def sync_bookmarks(request: BookmarkSyncRequest, user: dict = Depends(get_current_user)):
+    """Make the user's bookmarks exactly the given set."""
+    _check_db()
+    
+    now = datetime.utcnow().isoformat()
+    operations = [UpdateOne(*_bookmark_upsert(user["email"], b, now), upsert=True) for b in request.bookmarks]
+    operations.append(DeleteMany({
+        "user_email": user["email"],
+        "article_title": {"$nin": [b.article_title for b in request.bookmarks]}
+    }))
+    added, removed = await db.run(_write_bookmarks, user["email"], operations)
+    return {"success": True, "added": added, "removed": removed}
 
 
 # Reading History Routes
 @router_auth.post("/read")
-async def record_read(request: ReadRequest, authorization: str = Header(None)):
-    user = get_current_user(authorization)
+async def record_read(request: ReadRequest, user: dict = Depends(get_current_user)):
     _check_db()
     
-    # Upsert — update timestamp if already read
-    history_collection.update_one(
+    # Upsert — update timestamp if already read; returns the previous entry, None if new
+    previous = await db.run(
+        history_collection.find_one_and_update,
         {"user_email": user["email"], "article_title": request.article_title},
         {"$set": {
             "user_email": user["email"],
@@ -200,39 +388,50 @@ async def record_read(request: ReadRequest, authorization: str = Header(None)):
             "article_category": request.article_category,
             "read_at": datetime.utcnow().isoformat()
         }},
+        projection={"_id": 0, "article_category": 1},
         upsert=True
     )
+    category = _stat_key(request.article_category)
+    if previous is None:
+        await db.run(_inc_stats, user["email"], {"stats.total_reads": 1, f"stats.categories.{category}": 1})
+        # Trending counts each reader of an article once, like the history it is seeded from
+        trending_engine.record(request.article_title, request.article_source, request.article_category)
+    elif _stat_key(previous.get("article_category")) != category:
+        await db.run(_inc_stats, user["email"], {
+            f"stats.categories.{_stat_key(previous.get('article_category'))}": -1,
+            f"stats.categories.{category}": 1
+        })
     return {"success": True}
 
 
 @router_auth.get("/history")
-async def get_history(authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    if not _db_available:
-        return {"history": []}
+async def get_history(limit: int = 50, before: str = None, user: dict = Depends(get_current_user)):
+    if not db.available:
+        return {"history": [], "next_before": None}
     
-    history = list(history_collection.find(
-        {"user_email": user["email"]},
-        {"_id": 0, "user_email": 0}
-    ).sort("read_at", -1).limit(50))
-    return {"history": history}
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cursor = _decode_cursor(before) if before else None
+    history, next_before = await db.run(_page, history_collection, user["email"], "read_at", limit, cursor)
+    return {"history": history, "next_before": next_before}
 
 
 @router_auth.get("/profile")
-async def get_profile(authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    if not _db_available:
+async def get_profile(user: dict = Depends(get_current_user)):
+    if not db.available:
         return {"profile": {}}
     
-    user_doc = users_collection.find_one({"email": user["email"]}, {"_id": 0, "password": 0})
-    reads = list(history_collection.find({"user_email": user["email"]}, {"_id": 0}))
-    bookmark_count = bookmarks_collection.count_documents({"user_email": user["email"]})
+    # One point read by the unique email index; stats are maintained by /read and /bookmarks
+    user_doc = await db.run(
+        users_collection.find_one, {"email": user["email"]}, {"_id": 0, "name": 1, "created_at": 1, "stats": 1}
+    )
+    stats = (user_doc or {}).get("stats")
+    if stats is None:
+        stats = await db.run(compute_reading_stats, user["email"])
+        if user_doc:
+            await db.run(users_collection.update_one,
+                         {"email": user["email"], "stats": {"$exists": False}}, {"$set": {"stats": stats}})
     
-    # Calculate favorite category
-    cat_counts = {}
-    for r in reads:
-        cat = r.get("article_category", "Other")
-        cat_counts[cat] = cat_counts.get(cat, 0) + 1
+    cat_counts = {cat: n for cat, n in stats.get("categories", {}).items() if n > 0}
     fav_category = max(cat_counts, key=cat_counts.get) if cat_counts else "None"
     
     return {
@@ -240,39 +439,58 @@ async def get_profile(authorization: str = Header(None)):
             "name": user_doc.get("name", "") if user_doc else user["name"],
             "email": user["email"],
             "member_since": user_doc.get("created_at", "") if user_doc else "",
-            "total_reads": len(reads),
-            "total_bookmarks": bookmark_count,
+            "total_reads": stats.get("total_reads", 0),
+            "total_bookmarks": stats.get("bookmarks", 0),
             "favorite_category": fav_category,
             "category_breakdown": cat_counts
         }
     }
 
 
+# Preferences Routes
+@router_auth.get("/preferences")
+async def get_preferences(user: dict = Depends(get_current_user)):
+    _check_db()
+    
+    user_doc = await db.run(users_collection.find_one, {"email": user["email"]}, {"_id": 0, "preferences": 1})
+    preferences = (user_doc or {}).get("preferences", {})
+    return {"preferences": {
+        "categories": preferences.get("categories", []),
+        "digest": {**DigestPreferences().model_dump(), **preferences.get("digest", {})}
+    }}
+
+
+@router_auth.put("/preferences")
+async def update_preferences(request: PreferencesRequest, user: dict = Depends(get_current_user)):
+    _check_db()
+    
+    update = {}
+    if request.categories is not None:
+        update["preferences.categories"] = request.categories
+    if request.digest is not None:
+        if request.digest.channel not in ("email", "whatsapp"):
+            raise HTTPException(status_code=400, detail="Digest channel must be 'email' or 'whatsapp'")
+        if request.digest.enabled and request.digest.channel == "whatsapp" and not request.digest.whatsapp:
+            raise HTTPException(status_code=400, detail="A WhatsApp number is required for WhatsApp digests")
+        if request.digest.whatsapp:
+            request.digest.whatsapp = clean_phone_number(request.digest.whatsapp)
+        # Field by field, so the digest's last_sent_at survives
+        for field, value in request.digest.model_dump().items():
+            update[f"preferences.digest.{field}"] = value
+    if update:
+        await db.run(users_collection.update_one, {"email": user["email"]}, {"$set": update})
+    return {"success": True}
+
+
 # Trending — public endpoint (no auth required)
+# Served from the in-memory engine's precomputed top-K; the cache is bumped when it refreshes
+trending_engine.on_change = trending_cache.bump
+
+
 @router_auth.get("/trending")
-async def get_trending():
-    if not _db_available or history_collection is None:
-        return {"trending": []}
-    
-    # Aggregate most-read articles across all users
-    pipeline = [
-        {"$group": {
-            "_id": "$article_title",
-            "source": {"$first": "$article_source"},
-            "category": {"$first": "$article_category"},
-            "read_count": {"$sum": 1},
-            "last_read": {"$max": "$read_at"}
-        }},
-        {"$sort": {"read_count": -1}},
-        {"$limit": 10},
-        {"$project": {
-            "_id": 0,
-            "title": "$_id",
-            "source": 1,
-            "category": 1,
-            "read_count": 1,
-            "last_read": 1
-        }}
-    ]
-    trending = list(history_collection.aggregate(pipeline))
-    return {"trending": trending}
+async def get_trending(request: Request, window: str = DEFAULT_WINDOW):
+    if window not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {', '.join(WINDOWS)}")
+    return trending_cache.respond(
+        request, window, lambda: {"trending": trending_engine.top(window), "window": window}
+    )
@@ -1,96 +1,100 @@
-from fastapi import APIRouter
-from scraping.fetcher import get_news 
-from pymongo import MongoClient
-from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-load_dotenv("../.env")
+from fastapi import APIRouter, HTTPException, Request
+from scraping.fetcher import get_news
+from response_cache import article_cache
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from database import db
 
 router = APIRouter()
 
-# MongoDB connection with error handling
-try:
-    mongodb_uri = os.getenv("MONGODB_URI")
-    if not mongodb_uri:
-        raise ConnectionFailure("MONGODB_URI environment variable not set")
-    client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=5000)
-    # Test the connection
-    client.admin.command('ping')
-    db = client["news"]
-    collection = db["articles"]
-    mongodb_available = True
-except (ServerSelectionTimeoutError, ConnectionFailure) as e:
-    mongodb_available = False
-    client = None
-    db = None
-    collection = None
+MAX_PAGE_SIZE = 500
+
+collection = db.collection("articles")
 
 @router.get("/news/{article}")
 def read_news(article: int):
     return get_news(article)
 
+def _encode_cursor(doc):
+    if not doc.get("published_at"):
+        return None
+    return f"{doc['published_at'].isoformat()}_{doc['_id']}"
+
+
+def _decode_cursor(before: str):
+    """'<iso timestamp>' or '<iso timestamp>_<ObjectId>' (as returned in next_before)."""
+    ts, _, object_id = before.partition("_")
+    try:
+        return datetime.fromisoformat(ts), ObjectId(object_id) if object_id else None
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/articles")
-def get_articles_from_mongodb(limit: int = None):
-    """Get articles from MongoDB with optional limit, sorted by published date (newest first)"""
-    if not mongodb_available or not collection:
+def get_articles_from_mongodb(request: Request, limit: int = 100, before: str = None, category: str = None,
+                              source: str = None, sentiment: str = None, include_total: bool = False):
+    """Newest-first articles with keyset pagination.
+
+    Pass the returned next_before as ?before= to get the next page. Sorting
+    and filtering use the stored published_at field and its compound
+    indexes, so every page costs the same regardless of collection size.
+    Serialized pages are cached until the next ingest writes articles.
+    """
+    key = f"limit={limit}&before={before}&category={category}&source={source}&sentiment={sentiment}&total={include_total}"
+    return article_cache.respond(
+        request, key,
+        lambda: list_articles(limit, before, category, source, sentiment, include_total)
+    )
+
+
+def list_articles(limit: int = 100, before: str = None, category: str = None,
+                  source: str = None, sentiment: str = None, include_total: bool = False):
+    if not db.available:
         return {"error": "MongoDB not available", "total": 0, "articles": []}
-    
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = {}
+    if category and category != "All":
+        categories = [c.strip() for c in category.split(",") if c.strip()]
+        query["category"] = categories[0] if len(categories) == 1 else {"$in": categories}
+    if source:
+        query["source"] = source
+    if sentiment:
+        query["sentiment"] = sentiment
+    if before:
+        ts, object_id = _decode_cursor(before)
+        if object_id is None:
+            query["published_at"] = {"$lt": ts}
+        else:
+            query["$or"] = [
+                {"published_at": {"$lt": ts}},
+                {"published_at": ts, "_id": {"$lt": object_id}}
+            ]
+
     try:
-        # First, ensure we have an index on the published field for better performance
-        collection.create_index([("published", -1)])
-        
-        # Query to get all articles, excluding _id
-        # Sort by published date in descending order (newest first)
-        # Use a stable sort to maintain consistent ordering
-        pipeline = [
-            {"$match": {"published": {"$exists": True, "$ne": "Unknown"}}},
-            {"$addFields": {
-                "published_date": {
-                    "$dateFromString": {
-                        "dateString": "$published",
-                        "onError": "$fetched_at"  # Fallback to fetched_at if published date is invalid
-                    }
-                }
-            }},
-            {"$sort": {"published_date": -1}},  # Sort by parsed date
-            {"$project": {
-                "_id": 0,
-                "published_date": 0  # Remove the temporary field from results
-            }}
-        ]
-        
-        # Apply limit if specified
-        if limit and limit > 0:
-            pipeline.append({"$limit": limit})
-        
-        # Execute the aggregation pipeline
-        articles = list(collection.aggregate(pipeline))
-        total_articles = collection.count_documents({"published": {"$exists": True, "$ne": "Unknown"}})
-        
-        # If no articles with valid published dates, fall back to simple sort
-        if not articles:
-            cursor = collection.find(
-                {"published": {"$exists": True}}, 
-                {"_id": 0}
-            ).sort("published", -1)
-            
-            if limit and limit > 0:
-                cursor = cursor.limit(limit)
-                
-            articles = list(cursor)
-            total_articles = collection.count_documents({"published": {"$exists": True}})
-        
-        return {
-            "total": total_articles,
+        articles = list(
+            collection.find(query)
+            .sort([("published_at", -1), ("_id", -1)])
+            .limit(limit)
+        )
+        next_before = _encode_cursor(articles[-1]) if len(articles) == limit else None
+        for article in articles:
+            del article["_id"]
+
+        response = {
             "count": len(articles),
             "limit": limit,
+            "next_before": next_before,
             "articles": articles
         }
+        if include_total:
+            # Collection metadata when unfiltered; otherwise an indexed count
+            unfiltered = not query
+            response["total"] = collection.estimated_document_count() if unfiltered else collection.count_documents(
+                {k: v for k, v in query.items() if k not in ("published_at", "$or")}
+            )
+            response["total_is_estimate"] = unfiltered
+        return response
     except Exception as e:
         return {"error": str(e), "total": 0, "articles": []}
-
-
-
-
@@ -0,0 +1,141 @@
+# 📁 app/scraping/dedup.py
+#
+# Duplicate detection for the ingest path. Exact repeats are caught with
+# hashes of the normalized title and link; syndicated copies of the same
+# story from different sources are caught with 64-bit SimHash signatures
+# over word shingles, looked up through a banded index.
+
+import hashlib, os, re
+from urllib.parse import urlsplit
+
+NEAR_DUP_DISTANCE = int(os.getenv("NEAR_DUP_DISTANCE", "6"))  # max differing bits out of 64
+DEDUP_WINDOW = int(os.getenv("DEDUP_WINDOW", "5000"))         # recent stored articles to compare against
+SHINGLE_SIZE = 2
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(_WORD_RE.findall((title or "").lower()))
+
+
+def normalize_link(link: str) -> str:
+    """Drop scheme, query string, fragment and trailing slash."""
+    if not link:
+        return ""
+    parts = urlsplit(link.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return host + parts.path.rstrip("/")
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+_EMPTY_DIGEST = _digest("")
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over overlapping word shingles."""
+    words = _WORD_RE.findall((text or "").lower())
+    if not words:
+        return 0
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    # Column-wise majority vote over the bit strings of every shingle hash
+    rows = [format(_hash64(shingle), "064b") for shingle in shingles]
+    half = len(rows) / 2
+    bits = "".join("1" if column.count("1") > half else "0" for column in zip(*rows))
+    return int(bits, 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def signatures(article: dict) -> dict:
+    """Dedup fields stored next to each article document."""
+    return {
+        "title_hash": _digest(normalize_title(article.get("title", ""))),
+        "link_hash": _digest(normalize_link(article.get("link", ""))),
+        # hex string: Mongo integers are signed 64-bit
+        "simhash": format(simhash(f"{article.get('title', '')} {article.get('summary', '')}"), "016x"),
+    }
+
+
+class Deduper:
+    """Exact and near-duplicate index for one ingest run.
+
+    By the pigeonhole principle two signatures within max_distance bits
+    share at least one of max_distance + 1 bands, so near-duplicate
+    candidates come from a few dict lookups instead of a scan.
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUP_DISTANCE):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+        self._titles = {}
+        self._links = {}
+        self._bands = {}
+        self._docs = []
+
+    def _band_keys(self, value: int):
+        mask = (1 << self.band_bits) - 1
+        return [(i, (value >> (i * self.band_bits)) & mask) for i in range(self.bands)]
+
+    def add(self, article: dict, stored: bool = False):
+        """Index an article; its signature fields must already be set."""
+        doc_id = len(self._docs)
+        value = int(article["simhash"], 16)
+        self._docs.append((value, article, stored))
+        self._titles.setdefault(article["title_hash"], doc_id)
+        if article["link_hash"] != _EMPTY_DIGEST:
+            self._links.setdefault(article["link_hash"], doc_id)
+        for key in self._band_keys(value):
+            self._bands.setdefault(key, []).append(doc_id)
+
+    def find(self, article: dict):
+        """Return (kind, original, stored) for a duplicate, or None for a new article."""
+        doc_id = self._titles.get(article["title_hash"])
+        if doc_id is None:
+            doc_id = self._links.get(article["link_hash"])
+        if doc_id is not None:
+            _, original, stored = self._docs[doc_id]
+            return "exact", original, stored
+
+        value = int(article["simhash"], 16)
+        if value == 0:
+            return None
+        seen = set()
+        for key in self._band_keys(value):
+            for candidate in self._bands.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                other, original, stored = self._docs[candidate]
+                if hamming(value, other) <= self.max_distance:
+                    return "near", original, stored
+        return None
+
+    def load_recent(self, collection, limit: int = DEDUP_WINDOW):
+        """Seed the index with the newest stored articles."""
+        # Walks the (published_at, _id) index that /articles pages on; no in-memory sort
+        cursor = collection.find(
+            {},
+            {"_id": 0, "title": 1, "source": 1, "link": 1, "summary": 1,
+             "title_hash": 1, "link_hash": 1, "simhash": 1}
+        ).sort([("published_at", -1), ("_id", -1)]).limit(limit)
+        loaded = 0
+        for doc in cursor:
+            if "simhash" not in doc:
+                doc.update(signatures(doc))  # stored before signatures existed
+            self.add(doc, stored=True)
+            loaded += 1
+        return loaded
@@ -0,0 +1,100 @@
+# 📁 app/scraping/enrich.py
+#
+# Category, sentiment and reading-time enrichment done once per article at
+# ingest. Mirrors processArticles() in frontend/src/lib/newsUtils.js so the
+# stored fields match what the browser used to compute, but with one
+# compiled pattern per category and set lookups instead of array scans.
+
+import math, re
+from pymongo import UpdateOne
+
+POSITIVE_WORDS = frozenset(['good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'brilliant', 'outstanding', 'success', 'achievement', 'victory', 'win', 'positive', 'growth', 'improvement', 'progress', 'happy', 'joy', 'celebration', 'breakthrough', 'innovation', 'advancement', 'development', 'profit', 'gain', 'increase', 'rise', 'boost', 'surge', 'jump', 'climb', 'soar', 'leap', 'award', 'honor', 'record', 'milestone', 'peace', 'reform', 'support', 'benefit', 'rescue', 'hero', 'recover', 'thrive'])
+NEGATIVE_WORDS = frozenset(['bad', 'terrible', 'awful', 'horrible', 'disaster', 'crisis', 'problem', 'issue', 'failure', 'loss', 'defeat', 'negative', 'decline', 'drop', 'fall', 'crash', 'collapse', 'breakdown', 'sad', 'angry', 'fear', 'worry', 'concern', 'danger', 'threat', 'risk', 'attack', 'violence', 'death', 'injury', 'damage', 'destruction', 'corruption', 'scandal', 'controversy', 'conflict', 'protest', 'strike', 'penalty', 'fraud', 'crime', 'arrest', 'murder', 'accident', 'flood', 'drought', 'earthquake', 'terror', 'bomb', 'war', 'poverty'])
+
+# Order matters: the first category with a matching keyword wins
+CATEGORY_KEYWORDS = {
+    "Politics": ['election', 'government', 'minister', 'parliament', 'political', 'vote', 'democracy', 'congress', 'bjp', 'party', 'modi', 'president', 'senate', 'legislation', 'policy'],
+    "Technology": ['tech', 'technology', 'digital', 'app', 'software', 'ai', 'artificial intelligence', 'startup', 'innovation', 'cyber', 'data', 'cloud', 'robot', 'machine learning', 'blockchain'],
+    "Business": ['business', 'economy', 'market', 'stock', 'finance', 'investment', 'company', 'corporate', 'trade', 'economic', 'gdp', 'revenue', 'profit', 'startup', 'ipo'],
+    "Sports": ['cricket', 'football', 'sports', 'match', 'tournament', 'player', 'team', 'game', 'olympics', 'ipl', 'tennis', 'championship', 'medal', 'league', 'goal'],
+    "Entertainment": ['movie', 'film', 'actor', 'actress', 'bollywood', 'hollywood', 'music', 'celebrity', 'entertainment', 'show', 'concert', 'album', 'award', 'netflix', 'streaming'],
+    "Health": ['health', 'medical', 'doctor', 'hospital', 'disease', 'covid', 'vaccine', 'medicine', 'treatment', 'healthcare', 'mental health', 'fitness', 'nutrition', 'surgery', 'pandemic'],
+    "Education": ['education', 'school', 'college', 'university', 'student', 'exam', 'study', 'academic', 'learning', 'teacher', 'scholarship', 'curriculum', 'degree', 'enrollment'],
+    "International": ['world', 'international', 'global', 'foreign', 'diplomatic', 'un', 'nato', 'europe', 'america', 'china', 'russia', 'ukraine', 'middle east', 'africa', 'asia'],
+}
+CATEGORIES = list(CATEGORY_KEYWORDS) + ["Other"]
+SENTIMENTS = ["positive", "negative", "neutral"]
+
+# Substring semantics, like String.includes() on the frontend
+_CATEGORY_PATTERNS = [
+    (category, re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))))
+    for category, keywords in CATEGORY_KEYWORDS.items()
+]
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def assign_category(title: str, summary: str) -> str:
+    text = f"{title or ''} {summary or ''}".lower()
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(text):
+            return category
+    return "Other"
+
+
+def analyze_sentiment(text: str) -> str:
+    pos = neg = 0
+    for word in _WHITESPACE_RE.split(text.lower()):
+        if word in POSITIVE_WORDS:
+            pos += 1
+        elif word in NEGATIVE_WORDS:
+            neg += 1
+    total = pos + neg
+    if total == 0:
+        return "neutral"
+    if pos / total > 0.6:
+        return "positive"
+    if neg / total > 0.6:
+        return "negative"
+    return "neutral"
+
+
+def reading_time(text: str) -> str:
+    if not text:
+        return "1 min"
+    words = len(_WHITESPACE_RE.split(text))
+    return f"{max(1, math.ceil(words / 200))} min read"
+
+
+def enrichment(article: dict) -> dict:
+    """Fields added to an article document at ingest."""
+    title = article.get("title") or ""
+    summary = article.get("summary") or ""
+    text = f"{title} {summary}"
+    return {
+        "category": assign_category(title, summary),
+        "sentiment": analyze_sentiment(text),
+        "reading_time": reading_time(text),
+    }
+
+
+def ensure_indexes(collection):
+    collection.create_index("category")
+    collection.create_index("sentiment")
+
+
+def backfill(collection, batch_size: int = 500) -> int:
+    """Enrich stored articles that predate ingest-time enrichment."""
+    updated = 0
+    operations = []
+    cursor = collection.find(
+        {"category": {"$exists": False}},
+        {"_id": 1, "title": 1, "summary": 1}
+    )
+    for doc in cursor:
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": enrichment(doc)}))
+        if len(operations) >= batch_size:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += collection.bulk_write(operations, ordered=False).modified_count
+    return updated
@@ -0,0 +1,133 @@
+# 📁 app/scraping/feed_cache.py
+#
+# Persistent conditional-GET cache for RSS feeds. For every feed we remember
+# the ETag / Last-Modified validators and a hash of the last body we parsed,
+# so unchanged feeds can be skipped without running feedparser at all.
+# Validators for a changed body are only pending until commit(): a feed
+# counts as seen once its entries have been walked and saved, so a run that
+# stops part-way through a feed fetches it in full again next time.
+
+import json, os, hashlib, threading
+from datetime import datetime
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "feed_cache.json")
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class FeedCache:
+    """Per-feed validators and hit/miss counters, persisted as JSON."""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv("FEED_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = {}  # name -> validators of a downloaded body not yet committed
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._entries, indent=2)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not persist feed cache: {e}")
+
+    def _entry(self, name: str) -> dict:
+        return self._entries.setdefault(name, {
+            "etag": None,
+            "last_modified": None,
+            "hash": None,
+            "size": 0,
+            "hits": 0,
+            "misses": 0,
+            "bytes_saved": 0,
+        })
+
+    def request_headers(self, name: str) -> dict:
+        """Conditional request headers for the next fetch of this feed."""
+        with self._lock:
+            entry = self._entries.get(name) or {}
+            headers = {}
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            return headers
+
+    def not_modified(self, name: str):
+        """Record a 304 response. Saves the whole previous body."""
+        with self._lock:
+            entry = self._entry(name)
+            entry["hits"] += 1
+            entry["bytes_saved"] += entry["size"]
+            entry["checked_at"] = datetime.utcnow().isoformat()
+
+    def check_body(self, name: str, body: bytes, etag: str = None, last_modified: str = None) -> bool:
+        """Record a full response; returns True when the body is unchanged.
+
+        A changed body's validators stay pending until commit(name).
+        """
+        digest = content_hash(body)
+        validators = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "hash": digest,
+            "size": len(body),
+            "checked_at": datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            entry = self._entry(name)
+            unchanged = entry["hash"] == digest
+            if unchanged:
+                # Downloaded, but parsing and cleaning are skipped
+                entry["hits"] += 1
+                entry.update(validators)
+                self._pending.pop(name, None)
+            else:
+                entry["misses"] += 1
+                self._pending[name] = validators
+            return unchanged
+
+    def commit(self, name: str):
+        """Mark the last downloaded body of this feed as fully ingested."""
+        with self._lock:
+            validators = self._pending.pop(name, None)
+            if validators:
+                self._entry(name).update(validators)
+
+    def forget(self, name: str):
+        """Drop the stored hash so the next fetch is parsed in full."""
+        with self._lock:
+            self._pending.pop(name, None)
+            entry = self._entries.get(name)
+            if entry:
+                entry.update({"etag": None, "last_modified": None, "hash": None})
+
+    def stats(self) -> dict:
+        with self._lock:
+            feeds = {
+                name: {k: entry.get(k, 0) for k in ("hits", "misses", "bytes_saved")}
+                for name, entry in self._entries.items()
+            }
+        hits = sum(f["hits"] for f in feeds.values())
+        misses = sum(f["misses"] for f in feeds.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "bytes_saved": sum(f["bytes_saved"] for f in feeds.values()),
+            "feeds": feeds,
+        }
@@ -3,36 +3,43 @@
 from fastapi import HTTPException
 import feedparser
 from bs4 import BeautifulSoup
-import json, os, random
+from bs4.dammit import EntitySubstitution
+import json, os, random, re, time
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Dict, Any
-from datetime import datetime
-from pymongo import MongoClient, UpdateOne
-from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pymongo import UpdateOne
 from fastapi.encoders import jsonable_encoder
 from bson import ObjectId
 from dotenv import load_dotenv
+from scraping.feed_cache import FeedCache
+from scraping.dedup import Deduper, signatures
+from scraping import enrich
+from response_cache import article_cache
+from search_index import article_index
+from chat_context import chat_context
+from summary_worker import summary_worker
+from database import db
 
 load_dotenv()
 load_dotenv("../.env")
 
-# MongoDB connection with error handling
-try:
-    mongodb_uri = os.getenv("MONGODB_URI")
-    if not mongodb_uri:
-        raise ConnectionFailure("MONGODB_URI environment variable not set")
-    client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=5000)
-    # Test the connection
-    client.admin.command('ping')
-    db = client["news"]
-    collection = db["articles"]
-    mongodb_available = True
-    print("✅ MongoDB connected successfully")
-except (ServerSelectionTimeoutError, ConnectionFailure) as e:
-    print("⚠️ MongoDB not available, running without database storage from fetcher")
-    mongodb_available = False
-    client = None
-    db = None
-    collection = None
+# Articles collection on the shared client; None only when MONGODB_URI is unset
+collection = db.collection("articles")
+
+
+@db.on_connect
+def ensure_indexes():
+    collection.create_index("title_hash")
+    # Ingest upserts on (title, source); summary stores match on title
+    collection.create_index([("title", 1), ("source", 1)])
+    collection.create_index("link_hash")
+    enrich.ensure_indexes(collection)
+    # Keyset pagination for /articles: newest first, optionally per category
+    collection.create_index([("published_at", -1), ("_id", -1)])
+    collection.create_index([("category", 1), ("published_at", -1), ("_id", -1)])
 
 # Define your RSS sources
 RSS_FEEDS = {
@@ -52,82 +59,303 @@ RSS_FEEDS = {
     "Moneycontrol": "http://www.moneycontrol.com/rss/latestnews.xml"
 }
 
-# Function to strip HTML tags from RSS summary
+def parse_published(published, fallback: datetime = None) -> datetime:
+    """Normalize an RSS date (RFC-822, or ISO 8601) to a naive UTC datetime."""
+    if published and published != "Unknown":
+        for parse in (parsedate_to_datetime, datetime.fromisoformat):
+            try:
+                value = parse(published.strip())
+            except (TypeError, ValueError, IndexError):
+                continue
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value
+    return fallback or datetime.utcnow()
+
+
+def backfill_published(collection, batch_size: int = 500) -> int:
+    """Add published_at to stored articles that predate it."""
+    updated = 0
+    operations = []
+    cursor = collection.find({"published_at": {"$exists": False}}, {"_id": 1, "published": 1, "fetched_at": 1})
+    for doc in cursor:
+        fetched_at = parse_published(doc.get("fetched_at"))
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"published_at": parse_published(doc.get("published"), fetched_at)}}
+        ))
+        if len(operations) >= batch_size:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += collection.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+
+# Summary cleaning. Most feed summaries are plain text or simple markup, so
+# three tiers reproduce BeautifulSoup(html.parser).get_text(" ") exactly
+# without building a tree: plain text as is, entity-only text decoded in
+# place, and simple markup split on a compiled tag pattern. Anything outside
+# what the fast tiers can match exactly (comments, script/pre-like tags,
+# bare '<', unusual references) still goes through BeautifulSoup.
+_TAG_RE = re.compile(
+    r"<(?:/[a-zA-Z][a-zA-Z0-9]*\s*"
+    r"|[a-zA-Z][a-zA-Z0-9]*(?:\s+[a-zA-Z_:][-a-zA-Z0-9_:.]*"
+    r"(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s\"'=<>`]+))?)*\s*/?)>"
+)
+# Tags whose text BeautifulSoup keeps apart (script/style/ruby/template) or leaves unnormalized (pre/textarea)
+_SPECIAL_TAG_RE = re.compile(r"</?(?:script|style|template|rt|rp|pre|textarea)\b", re.I)
+_REF_RE = re.compile(r"&(?:([a-zA-Z][a-zA-Z0-9]*)|#([0-9]{1,7})|#[xX]([0-9a-fA-F]{1,6}));")
+# An '&' that is neither a literal before whitespace nor a complete, simple reference
+_ODD_AMP_RE = re.compile(r"&(?!\s|[a-zA-Z][a-zA-Z0-9]*;|#[0-9]{1,7};|#[xX][0-9a-fA-F]{1,6};)")
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+class _Fallback(Exception):
+    pass
+
+
+def _ref(match):
+    name, decimal, hexadecimal = match.groups()
+    if name:
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        if character is None:
+            raise _Fallback
+        return character
+    code = int(decimal, 10) if decimal else int(hexadecimal, 16)
+    # Code points BeautifulSoup maps specially (C0/C1 controls, surrogates) take the slow path
+    if 0x20 <= code < 0x7F or 0xA0 <= code < 0xD800 or 0xE000 <= code <= 0xFFFD or 0x10000 <= code <= 0x10FFFF:
+        return chr(code)
+    raise _Fallback
+
+
+def _decode_refs(text):
+    if "&" not in text:
+        return text
+    if _ODD_AMP_RE.search(text):
+        raise _Fallback
+    return _REF_RE.sub(_ref, text)
+
+
+def _markup_text(html):
+    """Text of simple markup, joined like get_text(separator=" ")."""
+    if "<!" in html or "<?" in html or _SPECIAL_TAG_RE.search(html):
+        raise _Fallback
+    strings = []
+    for segment in _TAG_RE.split(html):
+        if not segment:
+            continue
+        if "<" in segment:
+            raise _Fallback  # a '<' that isn't a tag we recognise
+        segment = _decode_refs(segment)
+        if not segment.strip(_ASCII_SPACES):
+            # Whitespace between tags collapses to one newline or space
+            segment = "\n" if "\n" in segment else " "
+        strings.append(segment)
+    return " ".join(strings)
+
+
 def clean_summary(summary_html):
+    """Strip HTML tags from an RSS summary; None when no text is left."""
     if not summary_html:
         return None
-    soup = BeautifulSoup(summary_html, "html.parser")
-    text = soup.get_text(separator=" ").strip()
+    try:
+        text = _markup_text(summary_html) if "<" in summary_html else _decode_refs(summary_html)
+    except _Fallback:
+        text = BeautifulSoup(summary_html, "html.parser").get_text(separator=" ")
+    text = text.strip()
     return text if text else None
 
 
-def get_news(n: int):
+# Concurrent fetch settings (overridable per call)
+FEED_TIMEOUT = float(os.getenv("FEED_TIMEOUT", "10"))          # seconds per feed request
+FEED_CONCURRENCY = int(os.getenv("FEED_CONCURRENCY", "8"))     # max feeds in flight
+SCRAPE_DEADLINE = float(os.getenv("SCRAPE_DEADLINE", "20"))    # seconds for the whole fetch phase
+
+FEED_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; TaazaKhabarBot/1.0)"}
+
+# ETag / Last-Modified / content-hash validators, persisted between runs
+feed_cache = FeedCache()
+
+
+def fetch_feed(name: str, url: str, timeout: float = FEED_TIMEOUT, use_cache: bool = True):
+    """Download a single feed with a hard timeout and parse it.
+
+    Returns None when the feed has not changed since the last fetch, in
+    which case parsing is skipped entirely.
+    """
+    headers = dict(FEED_HEADERS)
+    if use_cache:
+        headers.update(feed_cache.request_headers(name))
+    response = requests.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        feed_cache.not_modified(name)
+        return None
+    response.raise_for_status()
+    unchanged = feed_cache.check_body(
+        name,
+        response.content,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified")
+    )
+    if unchanged and use_cache:
+        return None
+    return feedparser.parse(response.content)
+
+
+def fetch_feeds(sources, timeout: float = None, concurrency: int = None, deadline: float = None, use_cache: bool = True):
+    """Fetch many feeds concurrently on a bounded thread pool.
+
+    Returns (feeds, status) where feeds maps source name -> parsed feed and
+    status lists which sources completed, were not modified, timed out or
+    failed.
+    """
+    timeout = FEED_TIMEOUT if timeout is None else timeout
+    concurrency = FEED_CONCURRENCY if concurrency is None else concurrency
+    deadline = SCRAPE_DEADLINE if deadline is None else deadline
+
+    feeds = {}
+    status = {"completed": [], "not_modified": [], "timed_out": [], "failed": {}}
+    if not sources:
+        return feeds, status
+
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(sources))))
+    pending = {executor.submit(fetch_feed, name, url, timeout, use_cache): name for name, url in sources}
+    try:
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    feed = future.result()
+                    if feed is None:
+                        status["not_modified"].append(name)
+                    else:
+                        feeds[name] = feed
+                        status["completed"].append(name)
+                except requests.Timeout:
+                    status["timed_out"].append(name)
+                except Exception as e:
+                    status["failed"][name] = str(e)
+    finally:
+        # Anything still pending missed the overall deadline; don't wait for it
+        status["timed_out"].extend(pending.values())
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    status["elapsed"] = round(time.monotonic() - started, 3)
+    return feeds, status
+
+
+def get_news(n: int, timeout: float = None, concurrency: int = None, deadline: float = None,
+             use_cache: bool = True, sources: List[str] = None):
     if n <= 0:
         return {"total": 0, "articles": [], "message": "No articles requested"}
     
-    # Get list of available RSS feeds and shuffle them
-    rss_sources = list(RSS_FEEDS.items())
+    # Get list of available RSS feeds (optionally only the requested ones) and shuffle them
+    rss_sources = [(name, url) for name, url in RSS_FEEDS.items() if sources is None or name in sources]
+    if not rss_sources:
+        return {"total": 0, "articles": [], "message": "No matching sources"}
     random.shuffle(rss_sources)
     
     all_articles = []
     collected_articles = 0
     processed_sources = set()
+    walked_sources = []  # feeds whose every entry was looked at; only these are committed to the feed cache
+    dedup_stats = {"exact": 0, "near": 0}
+    stored_links = []  # (original, duplicate) pairs for articles already in MongoDB
+    deduper = Deduper()
+    if db.available:
+        try:
+            deduper.load_recent(collection)
+        except Exception as e:
+            print(f"⚠️ Could not load recent articles for dedup: {e}")
     articles_per_source = max(1, n // min(5, len(rss_sources)))  # Distribute across at least 5 sources
     
-    # Continue until we've collected enough articles or processed all sources
-    while collected_articles < n and len(processed_sources) < len(rss_sources):
-        # Get next random source that hasn't been processed yet
-        for source_name, url in rss_sources:
-            if collected_articles >= n:
-                break
-                
-            if source_name in processed_sources:
-                continue
-                
-            try:
-                print(f"Fetching from {source_name}...")
-                feed = feedparser.parse(url)
-                source_articles = 0
-                
-                # Process entries from this feed
-                for entry in feed.entries:
-                    if collected_articles >= n or source_articles >= articles_per_source * 2:  # Allow some flexibility
-                        break
-                        
-                    summary = clean_summary(entry.get("summary", ""))
-                    if not summary:
-                        continue  # skip articles with no readable summary
-
-                    article_data = {
-                        "source": source_name,
-                        "title": entry.title.strip(),
-                        "summary": summary,
-                        "link": entry.link,
-                        "published": entry.get("published", "Unknown"),
-                        "fetched_at": datetime.utcnow().isoformat()
-                    }
+    # Fetch every feed concurrently so the scrape takes as long as the slowest feed
+    feeds, feed_status = fetch_feeds(rss_sources, timeout, concurrency, deadline, use_cache)
+    feed_status["new_articles"] = {}
+    if feed_status["not_modified"]:
+        print(f"Unchanged since last scrape: {', '.join(feed_status['not_modified'])}")
+    for source_name in feed_status["timed_out"]:
+        print(f"Timed out fetching from {source_name}")
+    for source_name, error in feed_status["failed"].items():
+        print(f"Error fetching from {source_name}: {error}")
+    
+    # Walk the sources in shuffled order, applying the per-source quota
+    for source_name, url in rss_sources:
+        if collected_articles >= n:
+            break
+        
+        feed = feeds.get(source_name)
+        if feed is None:
+            continue
+            
+        try:
+            source_articles = 0
+            walked = True
+            
+            # Process entries from this feed
+            for entry in feed.entries:
+                if collected_articles >= n or source_articles >= articles_per_source * 2:  # Allow some flexibility
+                    walked = False  # the rest are picked up on the next fetch
+                    break
                     
-                    # Check for duplicates before adding
-                    if not any(a['title'].lower() == article_data['title'].lower() for a in all_articles):
-                        all_articles.append(article_data)
-                        collected_articles += 1
-                        source_articles += 1
+                summary = clean_summary(entry.get("summary", ""))
+                if not summary:
+                    continue  # skip articles with no readable summary
+
+                fetched_at = datetime.utcnow()
+                article_data = {
+                    "source": source_name,
+                    "title": entry.title.strip(),
+                    "summary": summary,
+                    "link": entry.link,
+                    "published": entry.get("published", "Unknown"),
+                    "published_at": parse_published(entry.get("published"), fetched_at),
+                    "fetched_at": fetched_at.isoformat()
+                }
                 
-                processed_sources.add(source_name)
-                print(f"  - Found {source_articles} new articles from {source_name}")
+                article_data.update(signatures(article_data))
+
+                # Drop exact and near duplicates, linking cross-source copies to the original
+                match = deduper.find(article_data)
+                if match is None:
+                    article_data.update(enrich.enrichment(article_data))
+                    deduper.add(article_data)
+                    all_articles.append(article_data)
+                    collected_articles += 1
+                    source_articles += 1
+                    continue
+                kind, original, stored = match
+                dedup_stats[kind] += 1
+                if original["source"] != source_name:
+                    link = {"source": source_name, "title": article_data["title"], "link": article_data["link"]}
+                    if stored:
+                        stored_links.append((original, link))
+                    else:
+                        original.setdefault("also_reported_by", []).append(link)
+            
+            processed_sources.add(source_name)
+            if walked:
+                walked_sources.append(source_name)
+            feed_status["new_articles"][source_name] = source_articles
+            print(f"  - Found {source_articles} new articles from {source_name}")
                 
-                # If we've processed enough sources to potentially get the requested articles, break early
-                if len(processed_sources) >= min(5, len(rss_sources)) and collected_articles >= n:
-                    break
-                    
-            except Exception as e:
-                print(f"Error fetching from {source_name}: {str(e)}")
-                processed_sources.add(source_name)
-                continue
+        except Exception as e:
+            print(f"Error processing {source_name}: {str(e)}")
+            feed_cache.forget(source_name)  # re-parse this feed next time
+            feed_status["failed"][source_name] = str(e)
+            processed_sources.add(source_name)
+            continue
     
     # Save to MongoDB if available
     saved_count = 0
-    if mongodb_available and collection is not None and all_articles:
+    saved = not all_articles
+    if db.available and all_articles:
         try:
             # Prepare bulk operations for upsert
             operations = []
@@ -140,14 +368,37 @@ def get_news(n: int):
                     )
                 )
             
+            for original, link in stored_links:
+                operations.append(
+                    UpdateOne(
+                        {"title": original["title"], "source": original["source"]},
+                        {"$addToSet": {"also_reported_by": link}}
+                    )
+                )
+            
             if operations:
                 result = collection.bulk_write(operations, ordered=False)
-                saved_count = result.upserted_count + result.modified_count
+                saved = True
+                saved_count = result.upserted_count
                 print(f"✅ Saved {saved_count} articles to MongoDB")
+                if result.upserted_count or result.modified_count:
+                    article_cache.bump()  # cached /articles pages are now stale
+                # Upserts are the first len(all_articles) operations
+                upserted = [all_articles[i] for i in result.upserted_ids if i < len(all_articles)]
+                article_index.add_many(upserted)
+                chat_context.add_many(upserted)
+                summary_worker.enqueue(upserted)
                 
         except Exception as e:
             print(f"⚠️ Failed to save to MongoDB: {e}")
     
+    # A feed counts as seen only once its entries are stored; the rest are
+    # fetched and parsed in full again next time rather than answered 304
+    if saved:
+        for source_name in walked_sources:
+            feed_cache.commit(source_name)
+    feed_cache.save()
+    
     # Prepare response
     articles_for_return = jsonable_encoder(
         all_articles,
@@ -157,5 +408,7 @@ def get_news(n: int):
     return {
         "total": len(articles_for_return),
         "articles": articles_for_return,
-        "message": f"Fetched {len(articles_for_return)} articles from {len(processed_sources)} sources"
+        "message": f"Fetched {len(articles_for_return)} articles from {len(processed_sources)} sources",
+        "feeds": feed_status,
+        "duplicates": dedup_stats
     }
@@ -0,0 +1,190 @@
+# 📁 app/scraping/scheduler.py
+#
+# Background ingest scheduler. Scrapes run on a worker thread so the
+# blocking network and parsing work never touches the uvicorn event loop.
+# Every feed has its own polling interval that shrinks while the feed keeps
+# producing new articles and grows while it stays quiet.
+
+import os, queue, random, threading, time
+from datetime import datetime
+
+MIN_INTERVAL = float(os.getenv("SCRAPE_MIN_INTERVAL", str(10 * 60)))    # seconds
+MAX_INTERVAL = float(os.getenv("SCRAPE_MAX_INTERVAL", str(6 * 3600)))
+INITIAL_INTERVAL = float(os.getenv("SCRAPE_INTERVAL", str(3600)))
+JITTER = float(os.getenv("SCRAPE_JITTER", "0.1"))                        # +/- share of the interval
+ARTICLES_PER_FEED = int(os.getenv("SCRAPE_ARTICLES_PER_FEED", "4"))
+STARTUP_DELAY = 10
+
+
+def _iso(timestamp):
+    return datetime.utcfromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+class FeedSchedule:
+    """Polling state for one feed."""
+
+    def __init__(self, name: str, interval: float, next_due: float):
+        self.name = name
+        self.interval = interval
+        self.next_due = next_due
+        self.queued = False
+        self.last_polled = None
+        self.last_new = None
+        self.last_outcome = None
+
+    def as_dict(self):
+        return {
+            "interval_seconds": round(self.interval),
+            "next_run": _iso(self.next_due),
+            "last_polled": _iso(self.last_polled),
+            "last_new_articles": self.last_new,
+            "last_outcome": self.last_outcome,
+            "queued": self.queued,
+        }
+
+
+class IngestScheduler:
+    """Adaptive per-feed scheduler backed by a single scrape worker thread."""
+
+    def __init__(self, get_news, feed_names, min_interval: float = MIN_INTERVAL,
+                 max_interval: float = MAX_INTERVAL, initial_interval: float = INITIAL_INTERVAL,
+                 jitter: float = JITTER, articles_per_feed: int = ARTICLES_PER_FEED):
+        self.get_news = get_news
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.articles_per_feed = articles_per_feed
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._jobs = queue.Queue()
+        self._threads = []
+        self.in_flight = None
+        self.last_run = None
+        self.runs = 0
+        start = time.time() + STARTUP_DELAY
+        self.feeds = {
+            name: FeedSchedule(name, initial_interval, start + random.uniform(0, jitter * initial_interval))
+            for name in feed_names
+        }
+
+    # -- lifecycle -------------------------------------------------------
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for target, name in ((self._plan_loop, "ingest-scheduler"), (self._work_loop, "ingest-worker")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        self._jobs.put(None)
+        self._threads = []
+
+    def trigger(self, feed_names=None):
+        """Make the given feeds (default: all) due immediately."""
+        now = time.time()
+        with self._lock:
+            for name in feed_names or self.feeds:
+                if name in self.feeds:
+                    self.feeds[name].next_due = now
+        self._wakeup.set()
+
+    # -- scheduling ------------------------------------------------------
+
+    def _with_jitter(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _plan_loop(self):
+        while not self._stop.is_set():
+            now = time.time()
+            with self._lock:
+                due = [f.name for f in self.feeds.values() if not f.queued and f.next_due <= now]
+                for name in due:
+                    self.feeds[name].queued = True
+                waiting = [f.next_due for f in self.feeds.values() if not f.queued]
+            if due:
+                self._jobs.put(due)
+            sleep_for = max(1.0, min(waiting) - now) if waiting else self.max_interval
+            self._wakeup.wait(sleep_for)
+            self._wakeup.clear()
+
+    def _work_loop(self):
+        while not self._stop.is_set():
+            names = self._jobs.get()
+            if names is None:
+                break
+            self._run(names)
+
+    def _run(self, names):
+        started = time.time()
+        self.in_flight = {"feeds": names, "started_at": _iso(started)}
+        print(f"\n⏰ [Scheduled Scrape] Polling {len(names)} feeds: {', '.join(names)}")
+        try:
+            result = self.get_news(self.articles_per_feed * len(names), sources=names)
+            feeds = result.get("feeds", {})
+            error = None
+        except Exception as e:
+            print(f"⏰ [Scheduled Scrape] Error: {e}")
+            result, feeds, error = {}, {}, str(e)
+        duration = time.time() - started
+
+        with self._lock:
+            for name in names:
+                self._adapt(self.feeds[name], feeds, error)
+            self.in_flight = None
+            self.runs += 1
+            self.last_run = {
+                "started_at": _iso(started),
+                "duration_seconds": round(duration, 2),
+                "feeds": names,
+                "articles": result.get("total", 0),
+                "error": error,
+            }
+        print(f"⏰ [Scheduled Scrape] Done — fetched {result.get('total', 0)} articles in {duration:.1f}s")
+        self._wakeup.set()
+
+    def _adapt(self, feed: FeedSchedule, feeds: dict, error):
+        """Shrink the interval for busy feeds, grow it for quiet or failing ones."""
+        new = feeds.get("new_articles", {}).get(feed.name)
+        if error or feed.name in feeds.get("failed", {}) or feed.name in feeds.get("timed_out", []):
+            feed.last_outcome = "failed"
+            factor = 1.5
+        elif new is None and feed.name not in feeds.get("not_modified", []):
+            # Run filled its overall quota before reaching this feed
+            feed.last_outcome = "skipped"
+            factor = 1.0
+        elif not new:
+            feed.last_outcome = "unchanged"
+            factor = 1.5
+        elif new >= self.articles_per_feed:
+            # Quota filled: there is probably more waiting, come back sooner
+            feed.last_outcome = "busy"
+            factor = 0.5
+        else:
+            feed.last_outcome = "updated"
+            factor = 0.9
+        feed.interval = min(self.max_interval, max(self.min_interval, feed.interval * factor))
+        feed.last_new = new or 0
+        feed.last_polled = time.time()
+        feed.next_due = feed.last_polled + self._with_jitter(feed.interval)
+        feed.queued = False
+
+    # -- reporting -------------------------------------------------------
+
+    def status(self):
+        with self._lock:
+            waiting = [f.next_due for f in self.feeds.values() if not f.queued]
+            return {
+                "running": bool(self._threads),
+                "queue_depth": self._jobs.qsize(),
+                "in_flight": self.in_flight,
+                "next_run": _iso(min(waiting)) if waiting else None,
+                "runs": self.runs,
+                "last_run": self.last_run,
+                "feeds": {name: f.as_dict() for name, f in sorted(self.feeds.items())},
+            }
@@ -0,0 +1,108 @@
+import heapq
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+
+MAX_DOCS = int(os.getenv("SEARCH_INDEX_MAX_DOCS", "50000"))
+TITLE_WEIGHT = 2  # title terms count twice
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have he her his in into is it its of on or
+over said says she that the their they this to was were will with after amid about than
+""".split())
+
+
+def tokenize(text: str):
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class BM25Index:
+    """Incrementally maintained in-memory BM25 index over article titles and summaries.
+
+    Documents are keyed by title (the same key ingest upserts on). Only the
+    postings of the query terms are touched per search, so lookups don't
+    scan the collection. The oldest documents are evicted past max_docs.
+    """
+
+    def __init__(self, max_docs: int = MAX_DOCS, k1: float = 1.5, b: float = 0.75):
+        self.max_docs = max_docs
+        self.k1 = k1
+        self.b = b
+        self._docs = OrderedDict()  # title -> (article, term frequencies, length)
+        self._postings = {}         # term -> {title: tf}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _remove(self, key):
+        _, freqs, length = self._docs.pop(key)
+        self._total_length -= length
+        for term in freqs:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self._postings[term]
+
+    def add(self, article: dict):
+        key = article.get("title")
+        if not key:
+            return
+        terms = tokenize(key) * TITLE_WEIGHT + tokenize(article.get("summary"))
+        freqs = {}
+        for term in terms:
+            freqs[term] = freqs.get(term, 0) + 1
+        stored = {k: v for k, v in article.items() if k != "_id"}
+        with self._lock:
+            if key in self._docs:
+                self._remove(key)
+            self._docs[key] = (stored, freqs, len(terms))
+            self._total_length += len(terms)
+            for term, tf in freqs.items():
+                self._postings.setdefault(term, {})[key] = tf
+            while len(self._docs) > self.max_docs:
+                self._remove(next(iter(self._docs)))
+
+    def add_many(self, articles):
+        for article in articles:
+            self.add(article)
+
+    def search(self, query, k: int = 6, exclude_title: str = None):
+        """Top-k articles for a query string or list of terms, best first."""
+        terms = tokenize(query) if isinstance(query, str) else [t for q in query for t in tokenize(q)]
+        with self._lock:
+            n = len(self._docs)
+            if not n or not terms:
+                return []
+            avgdl = self._total_length / n
+            scores = {}
+            for term in set(terms):
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for key, tf in posting.items():
+                    length = self._docs[key][2]
+                    denom = tf + self.k1 * (1 - self.b + self.b * length / avgdl)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / denom
+            scores.pop(exclude_title, None)
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [dict(self._docs[key][0]) for key, _ in best]
+
+    def load(self, collection, limit: int = None):
+        """Build the index from the newest stored articles."""
+        limit = limit or self.max_docs
+        cursor = collection.find({}, {"_id": 0}).sort([("published_at", -1)]).limit(limit)
+        articles = list(cursor)
+        # Insert oldest first so eviction order follows publish time
+        self.add_many(reversed(articles))
+        return len(articles)
+
+
+# Shared index: loaded at startup, updated by every ingest batch
+article_index = BM25Index()
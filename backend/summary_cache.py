@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from pymongo import UpdateMany
+
+from database import db
+
+MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_SIZE", "2000"))
+TTL_SECONDS = float(os.getenv("SUMMARY_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def summary_key(prompt_version: str, title: str, summary: str) -> str:
+    """Content address of a summary: same prompt + same article -> same key."""
+    payload = "\x1f".join((prompt_version, title or "", summary or ""))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """LLM summary cache with single-flight generation.
+
+    Lookups go memory LRU (with TTL) -> the article document in MongoDB
+    (tldr / tldr_key fields) -> the generator. Concurrent requests for the
+    same key share one in-flight generation instead of each calling the model.
+    MongoDB is skipped while it is unavailable and its errors are only
+    logged, so /summarize keeps working from memory and the model.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.collection = None
+        self.on_store = None
+        self._entries = OrderedDict()  # key -> (text, stored_at)
+        self._inflight = {}            # key -> asyncio.Future
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def attach(self, collection, on_store=None):
+        """Persist summaries on the article documents of this collection.
+
+        on_store is called after a new summary is written, e.g. to
+        invalidate cached listings that now carry it inline.
+        """
+        self.collection = collection
+        self.on_store = on_store
+        if collection is not None:
+            collection.create_index("tldr_key", sparse=True)
+
+    # -- memory layer ----------------------------------------------------
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            text, stored_at = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return text
+
+    def _put_memory(self, key, text):
+        with self._lock:
+            self._entries[key] = (text, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # -- persistent layer ------------------------------------------------
+
+    def _persistent(self) -> bool:
+        return self.collection is not None and db.available
+
+    def _load_stored(self, key):
+        if not self._persistent():
+            return None
+        doc = self.collection.find_one({"tldr_key": key}, {"_id": 0, "tldr": 1})
+        return doc.get("tldr") if doc else None
+
+    @staticmethod
+    def _store_op(key, title, summary, text):
+        # Only documents with this exact title and text share the key; served by the (title, source) index
+        return (
+            {"title": title, "summary": summary},
+            {"$set": {"tldr": text, "tldr_key": key, "tldr_at": datetime.utcnow().isoformat()}}
+        )
+
+    def _store(self, key, title, summary, text):
+        if not self._persistent():
+            return
+        result = self.collection.update_many(*self._store_op(key, title, summary, text))
+        if result.modified_count and self.on_store:
+            self.on_store()
+
+    # -- public API ------------------------------------------------------
+
+    def cached(self, key: str) -> bool:
+        return self._get_memory(key) is not None
+
+    def put_many(self, items):
+        """Store (key, title, summary, text) summaries generated elsewhere (e.g. the
+        background worker) in one bulk write, calling on_store once."""
+        if not items:
+            return
+        if self.collection is not None:
+            result = self.collection.bulk_write(
+                [UpdateMany(*self._store_op(*item)) for item in items], ordered=False
+            )
+            if result.modified_count and self.on_store:
+                self.on_store()
+        for key, _, _, text in items:
+            self._put_memory(key, text)
+
+    async def get_or_create(self, key: str, title: str, summary: str, generate):
+        """Return the cached summary for key, or await generate() exactly once."""
+        text = self._get_memory(key)
+        if text is not None:
+            self.memory_hits += 1
+            return text
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            try:
+                text = await db.run(self._load_stored, key)
+            except Exception as e:
+                print(f"⚠️ Summary cache lookup failed: {e}")
+                text = None
+            if text is not None:
+                self.store_hits += 1
+            else:
+                self.misses += 1
+                text = await generate()
+                try:
+                    await db.run(self._store, key, title, summary, text)
+                except Exception as e:
+                    # The summary is still good: serve it and keep it in memory
+                    print(f"⚠️ Could not store summary: {e}")
+            self._put_memory(key, text)
+            future.set_result(text)
+            return text
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        served = self.memory_hits + self.store_hits + self.coalesced
+        lookups = served + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "in_flight": len(self._inflight),
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+        }
+
+
+summary_cache = SummaryCache()
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from database import db
+from llm_client import llm
+from summary_cache import summary_cache, summary_key
+
+BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "5"))
+BATCHES_PER_MINUTE = float(os.getenv("SUMMARY_BATCHES_PER_MINUTE", "6"))
+DAILY_TOKENS = int(os.getenv("SUMMARY_DAILY_TOKENS", "500000"))  # 0 = unlimited
+MAX_BACKLOG = int(os.getenv("SUMMARY_MAX_BACKLOG", "5000"))
+BACKFILL_LIMIT = int(os.getenv("SUMMARY_BACKFILL", "200"))
+MAX_ATTEMPTS = 2
+
+# Bump whenever BATCH_PROMPT changes; it is part of the summary key /summarize shares
+BATCH_PROMPT_VERSION = "v1"
+BATCH_PROMPT = """You are a professional news editor. Summarize each of the numbered news articles below with more detail than a standard TL;DR.
+
+For every article provide:
+1. A comprehensive summary paragraph (3-5 sentences) explaining the key events, context, and significance.
+2. A list of 2-3 key takeaway bullet points (start each with '- ').
+
+Keep the tone informative and objective. Use plain text but keep the bullet point structure.
+
+Return ONLY a JSON array with one object per article, in the form
+[{{"id": 1, "summary": "..."}}, ...]
+
+{articles}"""
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def parse_batch(text: str) -> dict:
+    """{id: summary} from the model's JSON answer, tolerating code fences."""
+    data = json.loads(_FENCE_RE.sub("", text.strip()))
+    return {int(item["id"]): item["summary"] for item in data if item.get("summary")}
+
+
+class SummaryWorker:
+    """Summarizes newly ingested articles in the background, several per LLM call.
+
+    Ingest enqueues its upserts; an asyncio task on the app's loop drains
+    the backlog in batches, paced to a batches-per-minute rate and a
+    rolling 24h token budget. Results go through summary_cache under the
+    same key /summarize uses, so readers get a cache hit instead of
+    waiting on the model.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, batches_per_minute: float = BATCHES_PER_MINUTE,
+                 daily_tokens: int = DAILY_TOKENS, max_backlog: int = MAX_BACKLOG):
+        self.batch_size = batch_size
+        self.interval = 60.0 / batches_per_minute if batches_per_minute > 0 else 0.0
+        self.daily_tokens = daily_tokens
+        self.max_backlog = max_backlog
+        self.prompt_version = None
+        self.clean = None
+        self._backlog = deque()  # (article, attempts)
+        self._queued = set()     # keys in the backlog
+        self._lock = threading.Lock()
+        self._usage = deque()    # (time, tokens) over the last 24h
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self.in_progress = 0
+        self.summarized = 0
+        self.skipped = 0
+        self.failed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.last_batch_at = None
+        self.last_error = None
+
+    def _key(self, article):
+        return summary_key(self.prompt_version, article.get("title"), article.get("summary"))
+
+    # -- producer side (any thread) ---------------------------------------
+
+    def enqueue(self, articles):
+        if self.prompt_version is None:
+            return 0
+        added = 0
+        with self._lock:
+            for article in articles:
+                if not article.get("title") or not article.get("summary"):
+                    continue
+                key = self._key(article)
+                if key in self._queued:
+                    continue
+                if len(self._backlog) >= self.max_backlog:
+                    self.dropped += 1
+                    continue
+                self._backlog.append(({"title": article["title"], "summary": article["summary"]}, 0))
+                self._queued.add(key)
+                added += 1
+        if added and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return added
+
+    def load_backlog(self, collection, limit: int = BACKFILL_LIMIT):
+        """Queue the newest stored articles that have no summary yet."""
+        cursor = collection.find(
+            {"tldr_key": {"$exists": False}}, {"_id": 0, "title": 1, "summary": 1}
+        ).sort("published_at", -1).limit(limit)
+        return self.enqueue(cursor)
+
+    # -- consumer side (event loop) ---------------------------------------
+
+    def start(self, prompt_version: str, clean=None):
+        """Start draining on the running loop; clean post-processes each summary."""
+        self.prompt_version = prompt_version
+        self.clean = clean
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _tokens_used(self):
+        cutoff = time.time() - 24 * 3600
+        with self._lock:
+            while self._usage and self._usage[0][0] < cutoff:
+                self._usage.popleft()
+            return sum(tokens for _, tokens in self._usage)
+
+    def _take_batch(self):
+        batch = []
+        with self._lock:
+            while self._backlog and len(batch) < self.batch_size:
+                article, attempts = self._backlog.popleft()
+                self._queued.discard(self._key(article))
+                batch.append((article, attempts))
+        return batch
+
+    def _requeue(self, items):
+        with self._lock:
+            for article, attempts in items:
+                if attempts + 1 >= MAX_ATTEMPTS:
+                    self.failed += 1
+                    continue
+                self._backlog.append((article, attempts + 1))
+                self._queued.add(self._key(article))
+
+    async def _run(self):
+        while True:
+            if not self._backlog:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if self.daily_tokens and self._tokens_used() >= self.daily_tokens:
+                # Budget spent: wait for the oldest usage to age out of the window
+                await asyncio.sleep(max(1.0, self._usage[0][0] + 24 * 3600 - time.time()))
+                continue
+            started = time.monotonic()
+            batch = self._take_batch()
+            try:
+                called = await self._summarize(batch)
+            except Exception as e:
+                # Never let one bad batch end the worker; its articles go back on the backlog
+                self.last_error = str(e)
+                print(f"⚠️ Summary worker batch failed: {e}")
+                self._requeue(batch)
+                called = True
+            if called:
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def _summarize(self, batch):
+        """Summarize one batch; False when nothing needed a model call."""
+        pending, ready = [], []
+        for article, attempts in batch:
+            if summary_cache.cached(self._key(article)):
+                self.skipped += 1  # a reader already asked for it through /summarize
+            elif article.get("tldr"):
+                ready.append((article, attempts, article["tldr"]))  # generated before; only storing it failed
+            else:
+                pending.append((article, attempts))
+        if pending:
+            ready += await self._generate(pending)
+        await self._store(ready)
+        return bool(pending)
+
+    async def _generate(self, pending):
+        """One model call for the batch; returns (article, attempts, summary) for each answer."""
+        prompt = BATCH_PROMPT.format(articles="\n\n".join(
+            f"Article {i}\nTitle: {article['title']}\nContent: {article['summary']}"
+            for i, (article, _) in enumerate(pending, 1)
+        ))
+        self.in_progress = len(pending)
+        try:
+            text = await llm.generate(prompt, endpoint="summarize_batch")
+            with self._lock:
+                self._usage.append((time.time(), _estimate_tokens(prompt) + _estimate_tokens(text)))
+            summaries = parse_batch(text)
+        except Exception as e:
+            self.last_error = str(e)
+            self._requeue(pending)
+            return []
+        finally:
+            self.in_progress = 0
+            self.batches += 1
+            self.last_batch_at = datetime.utcnow().isoformat()
+
+        missing, results = [], []
+        for i, (article, attempts) in enumerate(pending, 1):
+            summary = summaries.get(i)
+            if not summary:
+                missing.append((article, attempts))
+                continue
+            if self.clean:
+                summary = self.clean(summary)
+            results.append((article, attempts, summary))
+        self._requeue(missing)
+        return results
+
+    async def _store(self, results):
+        """Persist a batch's summaries in one write, so cached listings are invalidated once."""
+        if not results:
+            return
+        try:
+            await db.run(summary_cache.put_many, [
+                (self._key(article), article["title"], article["summary"], summary)
+                for article, _, summary in results
+            ])
+        except Exception as e:
+            # e.g. MongoDB is down: keep the text with the article so the retry skips the model
+            self.last_error = f"Storing summaries failed: {e}"
+            print(f"⚠️ {self.last_error}")
+            self._requeue([(dict(article, tldr=summary), attempts) for article, attempts, summary in results])
+            return
+        self.summarized += len(results)
+
+    def stats(self) -> dict:
+        used = self._tokens_used()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "backlog": len(self._backlog),
+            "in_progress": self.in_progress,
+            "summarized": self.summarized,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "batch_size": self.batch_size,
+            "tokens_24h": used,
+            "token_budget": self.daily_tokens or None,
+            "budget_exhausted": bool(self.daily_tokens) and used >= self.daily_tokens,
+            "last_batch_at": self.last_batch_at,
+            "last_error": self.last_error,
+        }
+
+
+# Shared worker: fed by every ingest batch, started with the app
+summary_worker = SummaryWorker()
@@ -0,0 +1,202 @@
+import bisect
+import heapq
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+TOP_K = int(os.getenv("TRENDING_TOP_K", "10"))
+REFRESH_INTERVAL = float(os.getenv("TRENDING_REFRESH", "10"))  # seconds between top-K rebuilds
+BUCKET_SECONDS = 300  # read counts are kept in 5-minute buckets
+
+# window -> (span in seconds, half-life of a read's weight in seconds)
+WINDOWS = {
+    "1h": (3600, 900),
+    "24h": (24 * 3600, 4 * 3600),
+    "7d": (7 * 24 * 3600, 24 * 3600),
+}
+DEFAULT_WINDOW = "24h"
+MAX_SPAN = max(span for span, _ in WINDOWS.values())
+
+
+class _Article:
+    __slots__ = ("source", "category", "last_read", "buckets", "scores")
+
+    def __init__(self, source, category):
+        self.source = source
+        self.category = category
+        self.last_read = 0.0
+        self.buckets = []  # [[bucket, reads]] oldest first
+        self.scores = {}   # window -> forward-decayed log score
+
+
+class TrendingEngine:
+    """Time-decayed trending articles, kept in memory.
+
+    Each read adds exp(lambda * t) to the article's score per window
+    (forward decay, stored as a log so it never overflows). Because every
+    score is measured against the same origin, ranking never needs the
+    scores re-decayed; the current value is exp(score - lambda * now).
+    A background thread rebuilds each window's top-K every few seconds,
+    so serving /auth/trending costs the same however many reads exist.
+    """
+
+    def __init__(self, top_k: int = TOP_K, refresh_interval: float = REFRESH_INTERVAL):
+        self.top_k = top_k
+        self.refresh_interval = refresh_interval
+        self._origin = time.time()
+        self._rates = {w: math.log(2) / half_life for w, (_, half_life) in WINDOWS.items()}
+        self._articles = {}  # title -> _Article
+        self._top = {w: [] for w in WINDOWS}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_sweep = 0.0
+        self.reads = 0
+        self.refreshes = 0
+        self.last_refresh_ms = 0.0
+        self.on_change = None
+
+    def record(self, title: str, source: str = None, category: str = None, at: float = None, count: int = 1):
+        """Count count reads of title at unix time at (default now)."""
+        if not title:
+            return
+        at = at or time.time()
+        bucket = int(at // BUCKET_SECONDS)
+        with self._lock:
+            article = self._articles.get(title)
+            if article is None:
+                article = self._articles[title] = _Article(source, category)
+            article.last_read = max(article.last_read, at)
+            buckets = article.buckets
+            if buckets and buckets[-1][0] == bucket:
+                buckets[-1][1] += count
+            else:
+                # Reads arrive in order, except when seeding from history
+                i = bisect.bisect_left(buckets, [bucket])
+                if i < len(buckets) and buckets[i][0] == bucket:
+                    buckets[i][1] += count
+                else:
+                    buckets.insert(i, [bucket, count])
+            for window, rate in self._rates.items():
+                weight = rate * (at - self._origin) + math.log(count)
+                previous = article.scores.get(window)
+                article.scores[window] = weight if previous is None else _logaddexp(previous, weight)
+            self.reads += count
+
+    def top(self, window: str = DEFAULT_WINDOW):
+        return self._top[window]
+
+    def refresh(self, now: float = None):
+        """Rebuild every window's top-K; returns True when any of them changed."""
+        now = now or time.time()
+        started = time.perf_counter()
+        changed = False
+        with self._lock:
+            if now - self._last_sweep > BUCKET_SECONDS:
+                self._sweep(now)
+            for window, (span, _) in WINDOWS.items():
+                top = self._rank(window, span, now)
+                if top != self._top[window]:
+                    self._top[window] = top
+                    changed = True
+        self.refreshes += 1
+        self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 1)
+        if changed and self.on_change:
+            self.on_change()
+        return changed
+
+    def _rank(self, window, span, now):
+        cutoff = now - span
+        first_bucket = int(cutoff // BUCKET_SECONDS) + 1
+        rate = self._rates[window]
+        candidates = heapq.nlargest(
+            self.top_k,
+            ((a.scores[window], title, a) for title, a in self._articles.items() if a.last_read >= cutoff),
+            key=lambda item: item[0],
+        )
+        top = []
+        for score, title, article in candidates:
+            buckets = article.buckets
+            start = bisect.bisect_left(buckets, [first_bucket])
+            top.append({
+                "title": title,
+                "source": article.source,
+                "category": article.category,
+                "read_count": sum(reads for _, reads in buckets[start:]),
+                "score": round(math.exp(score - rate * (now - self._origin)), 3),
+                "last_read": datetime.utcfromtimestamp(article.last_read).isoformat(),
+            })
+        return top
+
+    def _sweep(self, now):
+        # Forget articles nobody read within the longest window, and buckets older than it
+        cutoff = now - MAX_SPAN
+        oldest_bucket = int(cutoff // BUCKET_SECONDS)
+        for title in [t for t, a in self._articles.items() if a.last_read < cutoff]:
+            del self._articles[title]
+        for article in self._articles.values():
+            if article.buckets and article.buckets[0][0] < oldest_bucket:
+                article.buckets = article.buckets[bisect.bisect_left(article.buckets, [oldest_bucket]):]
+        self._last_sweep = now
+
+    def load(self, collection):
+        """Seed from reading_history entries within the longest window, replacing current state."""
+        with self._lock:
+            self._articles = {}
+            self.reads = 0
+        since = (datetime.utcnow() - timedelta(seconds=MAX_SPAN)).isoformat()
+        cursor = collection.find(
+            {"read_at": {"$gte": since}},
+            {"_id": 0, "article_title": 1, "article_source": 1, "article_category": 1, "read_at": 1}
+        ).sort("read_at", 1)
+        loaded = 0
+        for doc in cursor:
+            try:
+                # read_at is stored as naive UTC
+                at = datetime.fromisoformat(doc["read_at"]).replace(tzinfo=timezone.utc).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.record(doc.get("article_title"), doc.get("article_source"), doc.get("article_category"), at)
+            loaded += 1
+        self.refresh()
+        return loaded
+
+    def _loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Trending refresh failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="trending", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "articles": len(self._articles),
+            "reads": self.reads,
+            "refreshes": self.refreshes,
+            "last_refresh_ms": self.last_refresh_ms,
+            "windows": list(WINDOWS),
+        }
+
+
+def _logaddexp(a: float, b: float) -> float:
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+# Shared engine: fed by /auth/read, seeded from reading_history on connect
+trending_engine = TrendingEngine()
@@ -0,0 +1,299 @@
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+load_dotenv("../.env")
+
+WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN")
+WHATSAPP_PHONE_ID = os.getenv("WHATSAPP_PHONE_ID")
+API_URL = os.getenv("WHATSAPP_API_URL", "https://graph.facebook.com/v17.0")  # or a local mock, see benchmarks/fake_graph.py
+RATE = float(os.getenv("WHATSAPP_RATE", "20"))           # messages/sec allowed by the Graph API tier
+BURST = int(os.getenv("WHATSAPP_BURST", "20"))
+CONCURRENCY = int(os.getenv("WHATSAPP_CONCURRENCY", "8"))
+MAX_ATTEMPTS = int(os.getenv("WHATSAPP_MAX_ATTEMPTS", "3"))
+BACKOFF = float(os.getenv("WHATSAPP_BACKOFF", "1"))      # seconds, doubled per attempt
+TIMEOUT = float(os.getenv("WHATSAPP_TIMEOUT", "15"))
+SIMULATION_LOG = os.getenv("WHATSAPP_LOG", "whatsapp_messages.log")
+JOB_HISTORY = int(os.getenv("WHATSAPP_JOB_HISTORY", "1000"))
+
+
+class SendError(Exception):
+    def __init__(self, message: str, transient: bool, status: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.transient = transient
+        self.status = status
+        self.retry_after = retry_after
+
+
+class GraphAPISink:
+    """WhatsApp Cloud API messages endpoint over a pooled session."""
+
+    name = "graph_api"
+
+    def __init__(self, token: str, phone_id: str, api_url: str = API_URL, max_workers: int = CONCURRENCY):
+        self.url = f"{api_url.rstrip('/')}/{phone_id}/messages"
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="whatsapp")
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, to: str, text: str):
+        try:
+            response = self.session.post(self.url, json={
+                "messaging_product": "whatsapp",
+                "to": to,
+                "type": "text",
+                "text": {"body": text}
+            }, timeout=TIMEOUT)
+        except requests.RequestException as e:
+            raise SendError(str(e), transient=True)
+        if response.status_code == 200:
+            return
+        retry_after = response.headers.get("Retry-After")
+        raise SendError(
+            f"WhatsApp API error {response.status_code}: {response.text[:300]}",
+            transient=response.status_code == 429 or response.status_code >= 500,
+            status=response.status_code,
+            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+        )
+
+    async def send(self, to: str, text: str):
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._post, to, text)
+
+
+class LogSink:
+    """Simulation: appends each message to one log file instead of sending it."""
+
+    name = "log"
+
+    def __init__(self, path: str = SIMULATION_LOG):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _append(self, to: str, text: str):
+        record = json.dumps({"to": to, "at": datetime.now().isoformat(), "text": text}, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(record + "\n")
+
+    async def send(self, to: str, text: str):
+        await asyncio.to_thread(self._append, to, text)
+
+
+class TokenBucket:
+    """rate tokens/sec, up to burst banked; acquire() waits for one."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waits = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def pause(self, seconds: float):
+        # The API said slow down: no token for `seconds`; concurrent 429s don't stack
+        self._refill()
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            self.waits += 1
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _Job:
+    __slots__ = ("id", "to", "text", "status", "attempts", "error", "created_at", "sent_at")
+
+    def __init__(self, job_id, to, text):
+        self.id = job_id
+        self.to = to
+        self.text = text
+        self.status = "queued"
+        self.attempts = 0
+        self.error = None
+        self.created_at = datetime.utcnow().isoformat()
+        self.sent_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "to": self.to,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "sent_at": self.sent_at,
+        }
+
+
+def clean_phone_number(number: str) -> str:
+    # Clean phone number (remove non-digits except +)
+    phone_number = ''.join(c for c in number if c.isdigit() or c == '+')
+    return phone_number if phone_number.startswith('+') else '+' + phone_number
+
+
+def default_sink():
+    if not WHATSAPP_TOKEN or not WHATSAPP_PHONE_ID or WHATSAPP_TOKEN == "your_whatsapp_business_api_token":
+        return LogSink()
+    return GraphAPISink(WHATSAPP_TOKEN, WHATSAPP_PHONE_ID)
+
+
+class WhatsAppDispatcher:
+    """Queued WhatsApp sends, paced by a token bucket.
+
+    /send-whatsapp enqueues a job and returns its id. Worker tasks on the
+    app's loop take a token per send, so bursts are smoothed to the API's
+    rate instead of being answered with 429s; transient failures (429,
+    5xx, network) are retried with exponential backoff, honouring
+    Retry-After. Without credentials the sink is an append-only log.
+    """
+
+    def __init__(self, sink=None, rate: float = RATE, burst: int = BURST, concurrency: int = CONCURRENCY):
+        self.sink = sink or default_sink()
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self._jobs = OrderedDict()  # job_id -> _Job, oldest first
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending = []          # submitted before start()
+        self._loop = None
+        self._queue = None
+        self._tasks = []
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.last_error = None
+
+    @property
+    def simulation(self) -> bool:
+        return isinstance(self.sink, LogSink)
+
+    @property
+    def configured(self) -> bool:
+        # The simulation log is not a delivery; scheduled digests don't count it as one
+        return not self.simulation
+
+    def submit(self, to: str, text: str) -> dict:
+        """Queue a message; safe to call from any thread."""
+        job = _Job(f"{int(time.time())}-{next(self._ids)}", to, text)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+            self._put(job)
+        return job.to_dict()
+
+    def backlog(self) -> int:
+        return (self._queue.qsize() if self._queue else 0) + len(self._pending)
+
+    def job(self, job_id: str):
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def _put(self, job):
+        if self._loop is None:
+            self._pending.append(job)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, job)
+
+    def _trim(self):
+        # Forget the oldest finished jobs; queued and retrying ones are always kept
+        excess = len(self._jobs) - JOB_HISTORY
+        if excess > 0:
+            for job_id in [j.id for j in self._jobs.values() if j.status in ("sent", "failed")][:excess]:
+                del self._jobs[job_id]
+
+    def start(self):
+        """Start the workers on the running loop."""
+        if self._tasks:
+            return
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            for job in self._pending:
+                self._queue.put_nowait(job)
+            self._pending = []
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._loop = None
+
+    async def _run(self):
+        while True:
+            job = await self._queue.get()
+            await self.bucket.acquire()
+            job.status = "sending"
+            job.attempts += 1
+            try:
+                await self.sink.send(job.to, job.text)
+            except Exception as e:
+                transient = getattr(e, "transient", False)
+                retry_after = getattr(e, "retry_after", None)
+                if getattr(e, "status", None) == 429:
+                    self.rate_limited += 1
+                    self.bucket.pause(retry_after or 1.0)
+                job.error = str(e)
+                self.last_error = job.error
+                if not transient or job.attempts >= MAX_ATTEMPTS:
+                    job.status = "failed"
+                    self.failed += 1
+                    continue
+                job.status = "retrying"
+                self.retries += 1
+                self._loop.call_later(retry_after or BACKOFF * 2 ** (job.attempts - 1), self._queue.put_nowait, job)
+            else:
+                job.status = "sent"
+                job.error = None
+                job.sent_at = datetime.utcnow().isoformat()
+                self.sent += 1
+
+    def stats(self) -> dict:
+        statuses = {}
+        for job in list(self._jobs.values()):
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "sink": self.sink.name,
+            "simulation": self.simulation,
+            "running": any(not t.done() for t in self._tasks),
+            "queue_depth": self.backlog(),
+            "jobs": statuses,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "throttled": self.bucket.waits,
+            "rate_per_sec": self.bucket.rate,
+            "last_error": self.last_error,
+        }
+
+
+# Shared dispatcher: fed by /send-whatsapp, started with the app
+whatsapp = WhatsAppDispatcher()
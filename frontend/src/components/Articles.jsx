@@ -15,6 +15,8 @@ import { useAuth } from '../context/AuthContext'
 import { useToast } from './Toast'
 import './Articles.css'
 
+const PAGE_SIZE = 100
+
 function Articles() {
   const [articles, setArticles] = useState([])
   const [loading, setLoading] = useState(false)
@@ -27,6 +29,8 @@ function Articles() {
   const [lastRefreshed, setLastRefreshed] = useState(new Date())
   const [tldrMap, setTldrMap] = useState({})
   const [tldrLoading, setTldrLoading] = useState({})
+  const [nextBefore, setNextBefore] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   const prevArticleCount = useRef(0)
   const { isAuthenticated, isBookmarked, addBookmark, removeBookmark } = useAuth()
@@ -36,17 +40,18 @@ function Articles() {
 
 
 
-  // Fetch articles from DB
+  // Fetch the newest page of articles from DB
   const fetchArticlesFromDB = useCallback(async (silent = false) => {
     if (!silent) setLoading(true)
     setError(null)
     try {
-      const res = await axios.get(`${API_BASE}/articles`)
+      const res = await axios.get(`${API_BASE}/articles`, { params: { include_total: true, limit: PAGE_SIZE } })
       const processed = processArticles(res.data.articles || [])
       const newCount = processed.length
       const oldCount = prevArticleCount.current
 
       setArticles(processed)
+      setNextBefore(res.data.next_before || null)
       setTotalArticles(res.data.total || processed.length)
       setLastRefreshed(new Date())
 
@@ -61,6 +66,22 @@ function Articles() {
     }
   }, [addToast])
 
+  // Older articles, appended after the ones already shown
+  const loadMoreArticles = async () => {
+    if (!nextBefore) return
+    setLoadingMore(true)
+    try {
+      const res = await axios.get(`${API_BASE}/articles`, { params: { limit: PAGE_SIZE, before: nextBefore } })
+      setArticles(prev => [...prev, ...processArticles(res.data.articles || [])])
+      setNextBefore(res.data.next_before || null)
+    } catch (err) {
+      console.error(err)
+      addToast('⚠️ Failed to load more articles', 'warning', 4000)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const fetchAbout = async () => {
     try { const res = await axios.get(`${API_BASE}/About`); setAboutInfo(res.data) }
     catch (err) { console.error(err) }
@@ -123,6 +144,11 @@ function Articles() {
       setTldrMap(prev => { const n = { ...prev }; delete n[key]; return n })
       return
     }
+    if (article.tldr) {
+      // Already summarized server-side and served inline with the listing
+      setTldrMap(prev => ({ ...prev, [key]: article.tldr }))
+      return
+    }
     setTldrLoading(prev => ({ ...prev, [key]: true }))
     try {
       const res = await axios.post(`${API_BASE}/summarize`, {
@@ -273,6 +299,11 @@ function Articles() {
               ))}
             </div>
           )}
+          {!loading && !error && nextBefore && (
+            <button onClick={loadMoreArticles} disabled={loadingMore} className="load-more-btn">
+              {loadingMore ? 'Loading...' : `Load more (${articles.length} of ${totalArticles})`}
+            </button>
+          )}
         </main>
       </div>
 
@@ -48,11 +48,14 @@ const categoryMeta = {
     }
 }
 
+const PAGE_SIZE = 100
+
 function CategoryPage() {
     const { categoryName } = useParams()
     const [articles, setArticles] = useState([])
-    const [allArticles, setAllArticles] = useState([])
+    const [nextBefore, setNextBefore] = useState(null)
     const [loading, setLoading] = useState(true)
+    const [loadingMore, setLoadingMore] = useState(false)
     const [searchQuery, setSearchQuery] = useState('')
     const { isAuthenticated, isBookmarked, addBookmark, removeBookmark } = useAuth()
 
@@ -63,17 +66,20 @@ function CategoryPage() {
         tagline: 'Latest news and updates',
     }
 
-    const fetchArticles = useCallback(async () => {
-        setLoading(true)
+    // Filtered server-side; older pages are appended via next_before
+    const fetchArticles = useCallback(async (before = null) => {
+        before ? setLoadingMore(true) : setLoading(true)
         try {
-            const res = await axios.get(`${API_BASE}/articles`)
+            const params = { category, limit: PAGE_SIZE }
+            if (before) params.before = before
+            const res = await axios.get(`${API_BASE}/articles`, { params })
             const processed = processArticles(res.data.articles || [])
-            setAllArticles(processed)
-            setArticles(processed.filter(a => a.category === category))
+            setArticles(prev => before ? [...prev, ...processed] : processed)
+            setNextBefore(res.data.next_before || null)
         } catch (err) {
             console.error(err)
         } finally {
-            setLoading(false)
+            before ? setLoadingMore(false) : setLoading(false)
         }
     }, [category])
 
@@ -206,6 +212,11 @@ function CategoryPage() {
                             ))}
                         </div>
                     )}
+                    {!loading && nextBefore && (
+                        <button onClick={() => fetchArticles(nextBefore)} disabled={loadingMore} className="load-more-btn">
+                            {loadingMore ? 'Loading...' : 'Load more'}
+                        </button>
+                    )}
                 </div>
 
 
@@ -1,5 +1,4 @@
 import { useState, useRef, useEffect } from 'react'
-import axios from 'axios'
 import { HiPaperAirplane, HiUser, HiSparkles, HiRefresh } from 'react-icons/hi'
 import LoadingSpinner from './LoadingSpinner'
 import PromptBox from './PromptBox'
@@ -109,22 +108,50 @@ function Chatbot() {
     setIsLoading(true)
     setError(null)
 
+    const botId = Date.now() + 1
+    const updateBot = (changes) =>
+      setMessages(prev => prev.map(m => (m.id === botId ? { ...m, ...changes } : m)))
+
     try {
-      const response = await axios.post(`${API_BASE}/chat`, {
-        query: data.message,
-        image: data.image
+      // Stream the answer over Server-Sent Events so it renders as it is generated
+      const response = await fetch(`${API_BASE}/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ query: data.message, image: data.image })
       })
+      if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`)
 
-      const botMessage = {
-        id: Date.now() + 1,
-        type: 'bot',
-        content: response.data.text,
-        formatted: response.data.formatted,
-        sections: response.data.sections,
-        timestamp: new Date()
-      }
+      setMessages(prev => [...prev, { id: botId, type: 'bot', content: '', sections: [], streaming: true, timestamp: new Date() }])
 
-      setMessages(prev => [...prev, botMessage])
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      let text = ''
+      let sections = []
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const events = buffer.split('\n\n')
+        buffer = events.pop()
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1]
+          const payload = raw.match(/^data: (.*)$/m)?.[1]
+          if (!event || !payload) continue
+          const body = JSON.parse(payload)
+          if (event === 'token') {
+            text += body.text
+            updateBot({ content: text })
+          } else if (event === 'section') {
+            sections = [...sections, body]
+            updateBot({ sections, formatted: true })
+          } else if (event === 'done') {
+            updateBot({ content: body.text, formatted: body.formatted, sections: body.sections, streaming: false })
+          } else if (event === 'error') {
+            throw new Error(body.error)
+          }
+        }
+      }
     } catch (err) {
       console.error('Chat error:', err)
       setError('Failed to get response. Please try again.')
@@ -137,8 +164,9 @@ function Chatbot() {
         isError: true
       }
 
-      setMessages(prev => [...prev, errorMessage])
+      setMessages(prev => [...prev.filter(m => m.id !== botId), errorMessage])
     } finally {
+      updateBot({ streaming: false })
       setIsLoading(false)
     }
   }
@@ -192,11 +220,16 @@ function Chatbot() {
               )}
 
               <div className="message-text">
-                {message.formatted && message.sections ? (
+                {message.formatted && message.sections?.length ? (
                   <FormattedMessage sections={message.sections} />
                 ) : (
                   <div className="plain-text">{message.content}</div>
                 )}
+                {message.streaming && message.sections?.length > 0 && (
+                  <div className="typing-indicator">
+                    <LoadingSpinner size="small" />
+                  </div>
+                )}
               </div>
               <div className="message-timestamp">
                 {message.timestamp.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })}
@@ -205,7 +238,7 @@ function Chatbot() {
           </div>
         ))}
 
-        {isLoading && (
+        {isLoading && !messages.some(m => m.streaming) && (
           <div className="message bot">
             <div className="message-avatar">
               <HiSparkles size={16} />
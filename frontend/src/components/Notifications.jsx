@@ -8,6 +8,8 @@ import LoadingSpinner from './LoadingSpinner'
 import API_BASE from '../lib/api'
 import NeonCheckbox from './NeonCheckbox'
 
+const PAGE_SIZE = 100
+
 function Notifications() {
   const [articles, setArticles] = useState([])
   const [selectedArticles, setSelectedArticles] = useState([])
@@ -20,6 +22,7 @@ function Notifications() {
   const [messageType, setMessageType] = useState('')
   const [selectionMode, setSelectionMode] = useState('manual') // 'manual' or 'auto'
   const [topCount, setTopCount] = useState(5)
+  const [nextBefore, setNextBefore] = useState(null)
 
   // Format date consistently with Articles page
   const formatDate = (dateString) => {
@@ -46,16 +49,21 @@ function Notifications() {
     fetchArticles()
   }, [])
 
-  const fetchArticles = async () => {
+  // Pages come newest first, so older ones are appended and selected indices stay valid
+  const fetchArticles = async (before = null) => {
     setLoading(true)
     try {
-      const res = await axios.get(`${API_BASE}/articles`)
+      const params = { limit: PAGE_SIZE }
+      if (before) params.before = before
+      const res = await axios.get(`${API_BASE}/articles`, { params })
       // Add sort key and sort by published date (newest first)
       const sortedArticles = (res.data.articles || [])
         .map(addSortKey)
         .sort((a, b) => b._sortKey - a._sortKey)
 
-      setArticles(sortedArticles)
+      setArticles(prev => before ? [...prev, ...sortedArticles] : sortedArticles)
+      setNextBefore(res.data.next_before || null)
+      if (!before) setSelectedArticles([])
     } catch (err) {
       console.error('Failed to fetch articles:', err)
       setMessage('Failed to fetch articles')
@@ -132,7 +140,10 @@ function Notifications() {
 
       const response = await axios.post(`${API_BASE}${endpoint}`, payload)
 
-      setMessage(`Successfully sent ${articlesToSend.length} articles via ${notificationType}!`)
+      // Email is delivered in the background; the response only confirms it was queued
+      setMessage(response.data.status === 'queued'
+        ? `Queued ${articlesToSend.length} articles for delivery via ${notificationType}!`
+        : `Successfully sent ${articlesToSend.length} articles via ${notificationType}!`)
       setMessageType('success')
       if (selectionMode === 'manual') {
         setSelectedArticles([])
@@ -160,7 +171,7 @@ function Notifications() {
               <p>Select articles and send them via email or WhatsApp</p>
             </div>
           </div>
-          <button onClick={fetchArticles} disabled={loading} className="refresh-btn">
+          <button onClick={() => fetchArticles()} disabled={loading} className="refresh-btn">
             <HiRefresh size={16} className={loading ? 'spinning' : ''} />
             Refresh Articles
           </button>
@@ -384,6 +395,11 @@ function Notifications() {
                 </div>
               ))
             )}
+            {!loading && nextBefore && (
+              <button onClick={() => fetchArticles(nextBefore)} className="load-more-btn">
+                Load more
+              </button>
+            )}
           </div>
         </div>
       </div>
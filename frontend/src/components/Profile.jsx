@@ -8,7 +8,7 @@ import { categoryColors, formatDate } from '../lib/newsUtils'
 import LoadingSpinner from './LoadingSpinner'
 
 function Profile() {
-    const { user, token, isAuthenticated, bookmarks, removeBookmark } = useAuth()
+    const { user, token, isAuthenticated, bookmarks, hasMoreBookmarks, loadBookmarks, removeBookmark } = useAuth()
     const navigate = useNavigate()
     const [profile, setProfile] = useState(null)
     const [history, setHistory] = useState([])
@@ -28,7 +28,8 @@ function Profile() {
             const headers = { Authorization: `Bearer ${token}` }
             const [profileRes, historyRes] = await Promise.all([
                 axios.get(`${API_BASE}/auth/profile`, { headers }),
-                axios.get(`${API_BASE}/auth/history`, { headers })
+                axios.get(`${API_BASE}/auth/history`, { headers }),
+                loadBookmarks(true).catch(err => console.error('Failed to load bookmarks:', err))
             ])
             setProfile(profileRes.data.profile)
             const historyData = historyRes.data.history || []
@@ -227,6 +228,11 @@ function Profile() {
                                     </div>
                                 ))
                             )}
+                            {hasMoreBookmarks && (
+                                <button onClick={() => loadBookmarks()} className="profile-load-more">
+                                    Load more
+                                </button>
+                            )}
                         </div>
                     )}
                 </div>
@@ -9,6 +9,9 @@ export function AuthProvider({ children }) {
     const [token, setToken] = useState(() => localStorage.getItem('taaza-khabar-token'))
     const [loading, setLoading] = useState(true)
     const [bookmarks, setBookmarks] = useState([])
+    const [bookmarkTitles, setBookmarkTitles] = useState(() => new Set())
+    const [bookmarksCursor, setBookmarksCursor] = useState(null)
+    const [hasMoreBookmarks, setHasMoreBookmarks] = useState(false)
 
     const authHeaders = useCallback(() => ({
         headers: { Authorization: `Bearer ${token}` }
@@ -20,11 +23,11 @@ export function AuthProvider({ children }) {
             axios.get(`${API_BASE}/auth/me`, { headers: { Authorization: `Bearer ${token}` } })
                 .then(res => {
                     setUser(res.data.user)
-                    // Fetch bookmarks
-                    return axios.get(`${API_BASE}/auth/bookmarks`, { headers: { Authorization: `Bearer ${token}` } })
+                    // Only the titles: one indexed query however many bookmarks there are
+                    return axios.get(`${API_BASE}/auth/bookmarks/titles`, { headers: { Authorization: `Bearer ${token}` } })
                 })
                 .then(res => {
-                    setBookmarks(res.data.bookmarks || [])
+                    setBookmarkTitles(new Set(res.data.titles || []))
                 })
                 .catch(() => {
                     setToken(null)
@@ -43,10 +46,10 @@ export function AuthProvider({ children }) {
         setToken(newToken)
         setUser(userData)
         localStorage.setItem('taaza-khabar-token', newToken)
-        // Fetch bookmarks
+        // Fetch bookmarked titles
         try {
-            const bRes = await axios.get(`${API_BASE}/auth/bookmarks`, { headers: { Authorization: `Bearer ${newToken}` } })
-            setBookmarks(bRes.data.bookmarks || [])
+            const bRes = await axios.get(`${API_BASE}/auth/bookmarks/titles`, { headers: { Authorization: `Bearer ${newToken}` } })
+            setBookmarkTitles(new Set(bRes.data.titles || []))
         } catch { /* ignore */ }
         return res.data
     }
@@ -64,9 +67,23 @@ export function AuthProvider({ children }) {
         setToken(null)
         setUser(null)
         setBookmarks([])
+        setBookmarkTitles(new Set())
+        setBookmarksCursor(null)
+        setHasMoreBookmarks(false)
         localStorage.removeItem('taaza-khabar-token')
     }
 
+    // Full bookmark entries, a page at a time (newest first); reset starts over
+    const loadBookmarks = async (reset = false) => {
+        const params = { limit: 50 }
+        if (!reset && bookmarksCursor) params.before = bookmarksCursor
+        const res = await axios.get(`${API_BASE}/auth/bookmarks`, { ...authHeaders(), params })
+        const page = res.data.bookmarks || []
+        setBookmarks(prev => reset ? page : [...prev, ...page])
+        setBookmarksCursor(res.data.next_before)
+        setHasMoreBookmarks(!!res.data.next_before)
+    }
+
     const addBookmark = async (article) => {
         const res = await axios.post(`${API_BASE}/auth/bookmarks`, {
             article_title: article.title,
@@ -75,13 +92,14 @@ export function AuthProvider({ children }) {
             article_link: article.link,
             article_published: article.published || 'Unknown'
         }, authHeaders())
-        setBookmarks(prev => [...prev, {
+        setBookmarkTitles(prev => new Set(prev).add(article.title))
+        setBookmarks(prev => [{
             article_title: article.title,
             article_source: article.source,
             article_summary: article.summary,
             article_link: article.link,
             article_published: article.published || 'Unknown'
-        }])
+        }, ...prev])
         return res.data
     }
 
@@ -90,11 +108,16 @@ export function AuthProvider({ children }) {
             ...authHeaders(),
             params: { article_title: articleTitle }
         })
+        setBookmarkTitles(prev => {
+            const next = new Set(prev)
+            next.delete(articleTitle)
+            return next
+        })
         setBookmarks(prev => prev.filter(b => b.article_title !== articleTitle))
     }
 
     const isBookmarked = (articleTitle) => {
-        return bookmarks.some(b => b.article_title === articleTitle)
+        return bookmarkTitles.has(articleTitle)
     }
 
     const recordRead = async (article) => {
@@ -110,7 +133,7 @@ export function AuthProvider({ children }) {
 
     return (
         <AuthContext.Provider value={{
-            user, token, loading, bookmarks,
+            user, token, loading, bookmarks, hasMoreBookmarks, loadBookmarks,
             login, signup, logout,
             addBookmark, removeBookmark, isBookmarked,
             recordRead,
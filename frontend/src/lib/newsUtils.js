@@ -70,14 +70,15 @@ export const getReadingTime = (text) => {
 }
 
 // Process articles with sentiment and category
+// The backend enriches articles at ingest; only older documents fall back to local analysis
 export const processArticles = (articles) => {
     return articles
         .filter(a => a.summary && a.summary.trim().length > 0)
         .map(a => ({
             ...a,
-            sentiment: analyzeSentiment(`${a.title || ''} ${a.summary || ''}`),
-            category: assignCategory(a),
-            readingTime: getReadingTime(`${a.title || ''} ${a.summary || ''}`),
+            sentiment: a.sentiment || analyzeSentiment(`${a.title || ''} ${a.summary || ''}`),
+            category: a.category || assignCategory(a),
+            readingTime: a.reading_time || getReadingTime(`${a.title || ''} ${a.summary || ''}`),
             _sortKey: new Date(a.published === 'Unknown' ? a.fetched_at : a.published).getTime()
         })).sort((a, b) => b._sortKey - a._sortKey)
 }